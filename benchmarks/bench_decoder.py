@@ -0,0 +1,74 @@
+# The MIT License (MIT)
+
+# Copyright (c) 2021 Tom J. Sun
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""Compares the recursive stream Decoder with the iterative BufferDecoder.
+
+Run with: python benchmarks/bench_decoder.py
+"""
+
+import io
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from urtypes.cbor import Decoder, BufferDecoder
+from tests.fixtures import account
+
+# The recursive decoder uses a few Python frames per level, so keep the deep
+# inputs well within the default recursion limit.
+DEPTH = 250
+
+
+def inputs():
+    return [
+        ("deep list", b"\x81" * DEPTH + b"\x01"),
+        ("deep tags", b"\xd9\x01\x90" * DEPTH + b"\xa0"),
+        ("wide list", b"\x9a\x00\x01\x86\xa0" + b"\x18\x64" * 100000),
+        (
+            "wide map",
+            b"\xb9\x27\x10"
+            + b"".join(b"\x19" + i.to_bytes(2, "big") + b"\xf5" for i in range(10000)),
+        ),
+        ("account (1000 outputs)", account(1000).to_cbor()),
+    ]
+
+
+def bench(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number
+
+
+def main():
+    print("%-24s %14s %14s %8s" % ("input", "Decoder", "BufferDecoder", "speedup"))
+    for name, cbor in inputs():
+        number = max(1, 200000 // len(cbor))
+        recursive = bench(lambda: Decoder(io.BytesIO(cbor)).decode(), number)
+        iterative = bench(lambda: BufferDecoder(cbor).decode(), number)
+        print(
+            "%-24s %12.1fus %12.1fus %7.2fx"
+            % (name, recursive * 1e6, iterative * 1e6, recursive / iterative)
+        )
+
+
+if __name__ == "__main__":
+    main()
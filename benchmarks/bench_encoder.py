@@ -0,0 +1,90 @@
+# The MIT License (MIT)
+
+# Copyright (c) 2021 Tom J. Sun
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""Compares the recursive stream Encoder with the iterative BufferEncoder.
+
+Run with: python benchmarks/bench_encoder.py
+"""
+
+import io
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from urtypes.cbor import Encoder, BufferEncoder, DataItem
+from tests.fixtures import account
+
+# The recursive encoder uses a Python frame or two per level, so keep the
+# deep input well within the default recursion limit.
+DEPTH = 250
+
+
+def deep_tags():
+    value = {}
+    for _ in range(DEPTH):
+        value = DataItem(400, value)
+    return value
+
+
+def inputs():
+    return [
+        ("account (100 outputs)", account(100).to_data_item()),
+        ("account (10000 outputs)", account(10000).to_data_item()),
+        ("deep tags", deep_tags()),
+        ("wide list", list(range(100000))),
+    ]
+
+
+def bench(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number
+
+
+def encode_stream(value):
+    encoder = Encoder(io.BytesIO())
+    encoder.encode(value)
+    return encoder.output.getvalue()
+
+
+def encode_buffer(value):
+    encoder = BufferEncoder()
+    encoder.encode(value)
+    return encoder.output
+
+
+def main():
+    print("%-24s %14s %14s %8s" % ("input", "Encoder", "BufferEncoder", "speedup"))
+    for name, value in inputs():
+        size = len(encode_buffer(value))
+        assert encode_stream(value) == encode_buffer(value)
+        number = max(1, 200000 // size)
+        recursive = bench(lambda: encode_stream(value), number)
+        iterative = bench(lambda: encode_buffer(value), number)
+        print(
+            "%-24s %12.1fus %12.1fus %7.2fx"
+            % (name, recursive * 1e6, iterative * 1e6, recursive / iterative)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# The MIT License (MIT)
+
+# Copyright (c) 2021 Tom J. Sun
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""Measures parallel array decoding and encoding against serial by worker count.
+
+Run with: python benchmarks/bench_parallel.py [outputs]
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from urtypes.crypto import Account, Output
+from urtypes.parallel import decode_array
+from tests.fixtures import account
+
+
+def best(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def compare(name, serial, parallel):
+    serial = best(serial)
+    print("%s\n%-10s %10.1fms" % (name, "serial", serial * 1e3))
+
+    workers = 1
+    while workers <= 2 * (os.cpu_count() or 1):
+        with ProcessPoolExecutor(workers) as executor:
+            # Warm the pool up so process start-up is not measured.
+            parallel(workers, executor)
+            elapsed = best(lambda: parallel(workers, executor))
+        print(
+            "%-10s %10.1fms %7.2fx"
+            % ("%d workers" % workers, elapsed * 1e3, serial / elapsed)
+        )
+        workers *= 2
+
+
+def main():
+    outputs = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    item = account(outputs)
+    cbor = item.to_cbor()
+    print("%d outputs, %d bytes, %d cores" % (outputs, len(cbor), os.cpu_count()))
+
+    compare(
+        "decode",
+        lambda: Account.from_cbor(cbor).output_descriptors,
+        lambda workers, executor: decode_array(
+            cbor, Output, [2], workers, executor, threshold=0
+        ),
+    )
+    compare(
+        "encode",
+        item.to_cbor,
+        lambda workers, executor: item.to_cbor(workers=workers, executor=executor),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+# The MIT License (MIT)
+
+# Copyright (c) 2021 Tom J. Sun
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""Measures from_cbor and to_cbor throughput for every registry type.
+
+Inputs are the test vectors of tests/crypto and synthetic items of growing
+size. Output.descriptor() and HDKey.bip32_key() are measured as well. The
+results are written as JSON, to stdout or to the given file.
+
+Run with: python benchmarks/bench_registry.py [--quick] [--output FILE]
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from urtypes import Bytes
+from urtypes.cbor import BufferDecoder, DataItem
+from urtypes.crypto import (
+    Account,
+    HDKey,
+    Keypath,
+    MultiKey,
+    Output,
+    PathComponent,
+    PSBT,
+    SCRIPT_EXPRESSION_TAG_MAP,
+)
+from tests.crypto.test_account import AccountTestCase
+from tests.crypto.test_bip39 import BIP39TestCase
+from tests.crypto.test_ec_key import ECKeyTestCase
+from tests.crypto.test_hd_key import HDKeyTestCase
+from tests.crypto.test_output import OutputTestCase
+from tests.crypto.test_psbt import PSBTTestCase
+from tests.fixtures import account
+
+ACCOUNT_OUTPUTS = (10, 100, 1000, 10000)
+PSBT_SIZES = (1024, 64 * 1024, 1024 * 1024, 50 * 1024 * 1024)
+QUICK_LIMIT = 2 * 1024 * 1024
+
+
+def decode_multi_key(cbor):
+    # A MultiKey is only tagged as part of an Output, which passes it on as
+    # a DataItem.
+    return MultiKey.from_data_item(DataItem(None, BufferDecoder(cbor).decode()))
+
+
+def hd_key(index):
+    return HDKey(
+        {
+            "key": bytes([2]) + index.to_bytes(32, "big"),
+            "chain_code": bytes(32),
+            "origin": Keypath(
+                [
+                    PathComponent(48, True),
+                    PathComponent(0, True),
+                    PathComponent(2, True),
+                ],
+                index.to_bytes(4, "big"),
+                3,
+            ),
+            "children": Keypath(
+                [PathComponent(0, False), PathComponent(None, False)], None, None
+            ),
+            "parent_fingerprint": bytes(4),
+        }
+    )
+
+
+def multisig(threshold, keys):
+    return Output(
+        [SCRIPT_EXPRESSION_TAG_MAP[401], SCRIPT_EXPRESSION_TAG_MAP[407]],
+        MultiKey(threshold, [], [hd_key(i + 1) for i in range(keys)]),
+    )
+
+
+def inputs():
+    """Yields (name, item) for every input."""
+    for case in (
+        AccountTestCase,
+        BIP39TestCase,
+        ECKeyTestCase,
+        HDKeyTestCase,
+        OutputTestCase,
+        PSBTTestCase,
+    ):
+        for i, row in enumerate(case().table()):
+            yield "test vector %d" % (i + 1), row["item"]
+
+    # Types without test vectors of their own are taken from those above.
+    hd_keys = [row["item"] for row in HDKeyTestCase().table()]
+    yield "test vector 2 use_info", hd_keys[1].use_info
+    yield "test vector 2 origin", hd_keys[1].origin
+    yield "test vector 5 crypto_key", OutputTestCase().table()[4]["item"].crypto_key
+    yield "PSBT test vector 1", Bytes(PSBTTestCase().table()[0]["item"].data)
+
+    for outputs in ACCOUNT_OUTPUTS:
+        yield "%d outputs" % outputs, account(outputs)
+    item = multisig(15, 15)
+    yield "15-of-15 multisig", item
+    yield "15-of-15 multisig", item.crypto_key
+    for size in PSBT_SIZES:
+        yield "%d bytes" % size, PSBT(bytes(size))
+
+
+def measure(fn):
+    """Returns the best time of one call of fn in seconds, and the calls timed."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=3, number=number)) / number, number
+
+
+def result(type_name, input_name, operation, fn, size=None):
+    seconds, number = measure(fn)
+    row = {
+        "type": type_name,
+        "input": input_name,
+        "operation": operation,
+        "seconds": seconds,
+        "per_second": 1 / seconds,
+        "number": number,
+    }
+    if size is not None:
+        row["bytes"] = size
+        row["mb_per_second"] = size / seconds / 1e6
+    print(
+        "%-8s %-28s %-12s %12.1fus" % (type_name, input_name, operation, seconds * 1e6),
+        file=sys.stderr,
+    )
+    return row
+
+
+def bench(quick=False):
+    results = []
+    for name, item in inputs():
+        cls = type(item)
+        cbor = bytes(item.to_cbor())
+        if quick and len(cbor) > QUICK_LIMIT:
+            continue
+        decode = decode_multi_key if cls is MultiKey else cls.from_cbor
+        if decode(cbor) != item:
+            raise AssertionError("%s %s does not round-trip" % (cls.__name__, name))
+        type_name = cls.__name__
+        results.append(
+            result(type_name, name, "from_cbor", lambda: decode(cbor), len(cbor))
+        )
+        results.append(result(type_name, name, "to_cbor", item.to_cbor, len(cbor)))
+        if cls is Output:
+            results.append(result(type_name, name, "descriptor", item.descriptor))
+        elif cls is HDKey:
+            results.append(result(type_name, name, "bip32_key", item.bip32_key))
+        elif cls is Account:
+            results.append(
+                result(
+                    type_name,
+                    name,
+                    "descriptor",
+                    lambda: [output.descriptor() for output in item.output_descriptors],
+                )
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="skip inputs larger than %d bytes" % QUICK_LIMIT,
+    )
+    parser.add_argument("--output", help="write the JSON results to this file")
+    args = parser.parse_args()
+
+    report = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "results": bench(args.quick),
+    }
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,36 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 
+from . import registry
 from .registry import *
-from .bytes import *
-from .crypto import *
+from . import crypto
+
+
+# The item types are imported from their modules when first accessed, so
+# importing urtypes does not load every type. The modules of the crypto
+# package can be reached from here as well.
+def __getattr__(name):
+    # Not "from . import bytes", which would look the name up here first.
+    import urtypes.bytes as bytes
+
+    if name == "bytes":
+        return bytes
+    if name in bytes.__all__:
+        value = getattr(bytes, name)
+    elif name == "__all__":
+        value = [name for name in vars(registry) if not name.startswith("_")]
+        value.extend(bytes.__all__)
+        value.extend(crypto.__all__)
+    else:
+        try:
+            value = getattr(crypto, name)
+        except AttributeError:
+            raise AttributeError(
+                "module {!r} has no attribute {!r}".format(__name__, name)
+            ) from None
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__getattr__("__all__")))
@@ -26,11 +26,17 @@ BYTES = RegistryType("bytes", None)
 
 
 class Bytes(RegistryItem):
+    __slots__ = ("data",)
+
     def __init__(self, data):
         super().__init__()
         self.data = data
 
+    __hash__ = RegistryItem.__hash__
+
     def __eq__(self, o):
+        if self._hash_differs(o):
+            return False
         return self.data == o.data
 
     @classmethod
@@ -43,3 +49,6 @@ class Bytes(RegistryItem):
     @classmethod
     def from_data_item(cls, item):
         return cls(cls.mapping(item))
+
+
+__all__ = ["BYTES", "Bytes"]
@@ -25,3 +25,5 @@
 from .data import *
 from .decoder import *
 from .encoder import *
+from .events import *
+from .scan import *
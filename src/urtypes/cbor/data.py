@@ -50,10 +50,21 @@ class Mapping(object):
 
 
 class DataItem(Tagging):
+    """A tagged value, kept in the obj slot and also read as map."""
+
+    __slots__ = ()
+
     def __init__(self, tag, map):
-        super().__init__(tag, Mapping(map))
         self.tag = tag
-        self.map = map
+        self.obj = map
+
+    @property
+    def map(self):
+        return self.obj
+
+    @map.setter
+    def map(self, map):
+        self.obj = map
 
 
 class _Undefined(object):
@@ -38,27 +38,54 @@ class _Break(InvalidCborError):
         InvalidCborError.__init__(self, "Invalid BREAK code occurred")
 
 
+class _Incomplete(Exception):
+    pass
+
+
+MAX_DEPTH = 1024
+
+_READ_SIZE = 65536
+
+# Estimated pointer size, used to account for list items and map pairs.
+_SLOT_SIZE = 8
+
+_LIST = 0
+_DICT = 1
+_TAG = 2
+
+_NO_KEY = object()
+
+
+class Limits(object):
+    """Bounds on the resources used to decode one top-level item.
+
+    max_depth caps the nesting of lists, maps and tags, and max_items the
+    total number of list items and map pairs. max_bytes caps the length of
+    any one bytestring or textstring, or chunk of one. max_allocation caps
+    an estimate of the memory taken by the decoded item: the bytes of its
+    strings plus a pointer for each list item and two for each map pair.
+    A bound of None is not checked.
+    """
+
+    def __init__(
+        self, max_depth=MAX_DEPTH, max_items=None, max_bytes=None, max_allocation=None
+    ):
+        self.max_depth = max_depth
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.max_allocation = max_allocation
+
+
+DEFAULT_LIMITS = Limits()
+
+
 class Decoder(object):
     def __init__(self, input):
-        self._jump_table = [
-            lambda *args: self.decode_integer(*args, sign=False),
-            lambda *args: self.decode_integer(*args, sign=True),
-            self.decode_bytestring,
-            self.decode_textstring,
-            self.decode_list,
-            self.decode_dict,
-            self.decode_tagging,
-            self.decode_other,
-        ]
         self.input = input
 
     def decode(self):
-        mtype, ainfo = self._decode_ibyte()
-        try:
-            decoder = self._jump_table[mtype]
-        except KeyError:
-            raise InvalidCborError("Invalid major type {}".format(mtype))
-        return decoder(mtype, ainfo)
+        ibyte = self._read_byte()
+        return _DISPATCH[ibyte](self, ibyte)
 
     def decode_integer(self, mtype, ainfo, sign=False):
         res = self._decode_length(ainfo)
@@ -70,32 +97,16 @@ class Decoder(object):
     def decode_bytestring(self, mtype, ainfo):
         length = self._decode_length(ainfo)
         if length is None:
-            res = bytearray()
-            while True:
-                mtype_, ainfo_ = self._decode_ibyte()
-                if (mtype_, ainfo_) == (7, 31):
-                    break
-                if mtype_ != 2:
-                    pass
-                res.extend(self.decode_bytestring(mtype_, ainfo_))
-            return bytes(res)
+            return bytes(self._read_chunks(mtype))
         else:
-            return self._read(length)
+            return self._read_bytes(length)
 
     def decode_textstring(self, mtype, ainfo):
         length = self._decode_length(ainfo)
         if length is None:
-            res = bytearray()
-            while True:
-                mtype_, ainfo_ = self._decode_ibyte()
-                if (mtype_, ainfo_) == (7, 31):
-                    break
-                if mtype_ != 3:
-                    pass
-                res.extend(self.decode_bytestring(mtype_, ainfo_))
-            return res.decode("utf-8")
+            return self._read_chunks(mtype).decode("utf-8")
         else:
-            return self._read(length).decode("utf-8")
+            return self._read_text(length)
 
     def decode_list(self, mtype, ainfo):
         length = self._decode_length(ainfo)
@@ -108,9 +119,10 @@ class Decoder(object):
                     break
             return res
         else:
-            res = [None for _ in range(length)]
-            for n in range(length):
-                res[n] = self.decode()
+            # The declared length is untrusted, so don't preallocate for it.
+            res = []
+            for _ in range(length):
+                res.append(self.decode())
             return res
 
     def decode_dict(self, mtype, ainfo):
@@ -167,10 +179,11 @@ class Decoder(object):
         elif ainfo == 31:
             raise _Break()
 
+    def _read_byte(self):
+        return self._read(1)[0]
+
     def _decode_ibyte(self):
-        byte = self._read(1)[0]
-        if isinstance(byte, str):
-            byte = ord(byte)
+        byte = self._read_byte()
         return (byte & 0b11100000) >> 5, byte & 0b00011111
 
     def _decode_length(self, ainfo):
@@ -188,17 +201,607 @@ class Decoder(object):
             return None
         raise InvalidCborError("Invalid additional information {}".format(ainfo))
 
+    def _read_chunks(self, mtype):
+        res = bytearray()
+        while True:
+            mtype_, ainfo_ = self._decode_ibyte()
+            if (mtype_, ainfo_) == (7, 31):
+                return res
+            if mtype_ != mtype or ainfo_ == 31:
+                raise InvalidCborError(
+                    "Invalid chunk of major type {} in indefinite-length string".format(
+                        mtype_
+                    )
+                )
+            length = self._decode_length(ainfo_)
+            self._allocate(length)
+            res.extend(self._read(length))
+
     def _read(self, n):
-        m = self.input.read(n)
+        if n <= _READ_SIZE:
+            m = self.input.read(n)
+        else:
+            # Declared lengths are untrusted, so large reads only grow as far
+            # as the input actually goes.
+            m = bytearray()
+            while len(m) < n:
+                chunk = self.input.read(min(n - len(m), _READ_SIZE))
+                if not chunk:
+                    break
+                m.extend(chunk)
+            m = bytes(m)
         if len(m) != n:
             raise InvalidCborError(
                 "Expected {} bytes, got {} bytes instead".format(n, len(m))
             )
         return m
 
+    def _read_bytes(self, n):
+        return self._read(n)
+
+    def _read_text(self, n):
+        return str(self._read(n), "utf-8")
+
+    def _allocate(self, n):
+        pass
+
+
+class BufferDecoder(Decoder):
+    """Decodes directly from a bytes-like object using an integer cursor.
+
+    Reads are memoryview slices of the source, so no intermediate stream is
+    needed. With zero_copy enabled, bytestrings are returned as memoryview
+    slices that share memory with the source buffer instead of bytes copies.
+
+    Containers are decoded iteratively with an explicit stack rather than by
+    recursion. Each top-level item is decoded within limits, and exceeding
+    them raises InvalidCborError. Lengths that the rest of the input could
+    not possibly hold are rejected before anything is read.
+
+    With lazy enabled, only the outermost list or map is decoded. Lists and
+    maps nested inside it are skipped over and returned as LazyItem spans of
+    the source buffer, which decode themselves the same way on first access.
+    preserve_raw is passed on to those spans.
+    """
+
+    def __init__(
+        self,
+        data,
+        offset=0,
+        zero_copy=False,
+        lazy=False,
+        limits=None,
+        preserve_raw=False,
+    ):
+        super().__init__(None)
+        self.data = memoryview(data)
+        self.pos = offset
+        self.zero_copy = zero_copy
+        self.lazy = lazy
+        self.preserve_raw = preserve_raw
+        self.limits = limits if limits is not None else DEFAULT_LIMITS
+        self._suspended = None
+        self._items = 0
+        self._allocated = 0
+
+    def decode(self):
+        # The innermost open container is kept in locals: its kind, its value
+        # (a list, a dict or a tag number), the items remaining (None for
+        # indefinite lengths) and a pending map key. Enclosing containers are
+        # saved on the stack, starting with the top level whose kind is None.
+        if self._suspended is not None:
+            stack, kind, container, remaining, key = self._suspended
+            self._suspended = None
+        else:
+            stack = []
+            kind = container = remaining = None
+            key = _NO_KEY
+            self._items = 0
+            self._allocated = 0
+        max_depth = self.limits.max_depth
+        data = self.data
+        dispatch = _DISPATCH
+        while True:
+            pos = self.pos
+            allocated = self._allocated
+            try:
+                if pos >= len(data):
+                    self._underflow(1)
+                ibyte = data[pos]
+                self.pos = pos + 1
+                if ibyte < 0x18:
+                    value = ibyte
+                elif ibyte < 0x80 or ibyte >= 0xE0:
+                    if ibyte != 0xFF:
+                        value = dispatch[ibyte](self, ibyte)
+                    else:
+                        if kind is None or remaining is not None:
+                            raise _Break()
+                        if key is not _NO_KEY:
+                            raise InvalidCborError("Missing value for key in map")
+                        value = container
+                        kind, container, remaining, key = stack.pop()
+                else:
+                    ainfo = ibyte & 0b00011111
+                    length = ainfo if ainfo < 24 else self._decode_length(ainfo)
+                    if length == 0 and ibyte < 0xC0:
+                        value = [] if ibyte < 0xA0 else {}
+                    elif self.lazy and ibyte < 0xC0 and _in_container(kind, stack):
+                        self.pos = _skip(data, pos, max_depth)
+                        value = LazyItem(
+                            data,
+                            pos,
+                            self.pos - pos,
+                            self.zero_copy,
+                            self.limits,
+                            self.preserve_raw,
+                        )
+                    else:
+                        if max_depth is not None and len(stack) >= max_depth:
+                            raise InvalidCborError(
+                                "Maximum nesting depth {} exceeded".format(max_depth)
+                            )
+                        if length is not None and ibyte < 0xC0:
+                            self._reserve(length, ibyte >= 0xA0)
+                        stack.append((kind, container, remaining, key))
+                        key = _NO_KEY
+                        if ibyte < 0xA0:
+                            kind, container, remaining = _LIST, [], length
+                        elif ibyte < 0xC0:
+                            kind, container, remaining = _DICT, {}, length
+                        elif length is None:
+                            raise InvalidCborError("Invalid additional information 31")
+                        else:
+                            kind, container, remaining = _TAG, length, 1
+                        continue
+            except _Incomplete:
+                # Only raised by IncrementalDecoder. Items are read whole, so
+                # rewinding to the start of this one is enough to resume, once
+                # the strings it has already charged are given back.
+                self.pos = pos
+                self._allocated = allocated
+                self._suspended = (stack, kind, container, remaining, key)
+                raise
+
+            while True:
+                if kind == _LIST:
+                    container.append(value)
+                elif kind == _DICT:
+                    if key is _NO_KEY:
+                        key = value
+                        break
+                    container[key] = value
+                    key = _NO_KEY
+                elif kind == _TAG:
+                    value = DataItem(container, value)
+                    kind, container, remaining, key = stack.pop()
+                    continue
+                else:
+                    return value
+                if remaining is None:
+                    self._reserve(None, kind == _DICT)
+                    break
+                remaining -= 1
+                if remaining:
+                    break
+                value = container
+                kind, container, remaining, key = stack.pop()
+
+    def _read_byte(self):
+        pos = self.pos
+        if pos >= len(self.data):
+            self._underflow(1)
+        self.pos = pos + 1
+        return self.data[pos]
+
+    def _read(self, n):
+        pos = self.pos
+        end = pos + n
+        if end > len(self.data):
+            self._underflow(n)
+        self.pos = end
+        return self.data[pos:end]
+
+    def _read_bytes(self, n):
+        self._allocate(n)
+        if self.zero_copy:
+            return self._read(n)
+        return bytes(self._read(n))
+
+    def _read_text(self, n):
+        self._allocate(n)
+        return str(self._read(n), "utf-8")
+
+    def _allocate(self, n):
+        limits = self.limits
+        if limits.max_bytes is not None and n > limits.max_bytes:
+            raise InvalidCborError(
+                "String of {} bytes exceeds the limit of {}".format(n, limits.max_bytes)
+            )
+        self._allocated += n
+        if (
+            limits.max_allocation is not None
+            and self._allocated > limits.max_allocation
+        ):
+            raise InvalidCborError(
+                "Allocation exceeds the limit of {} bytes".format(limits.max_allocation)
+            )
+
+    def _reserve(self, length, pairs):
+        # Accounts for a container's declared length, or for one more item of
+        # an indefinite-length container if length is None.
+        if length is None:
+            length = 1
+        elif self._bounded():
+            # Every item takes at least one byte of input.
+            if (length * 2 if pairs else length) > len(self.data) - self.pos:
+                raise InvalidCborError(
+                    "Declared length {} exceeds the remaining input".format(length)
+                )
+        limits = self.limits
+        self._items += length
+        if limits.max_items is not None and self._items > limits.max_items:
+            raise InvalidCborError(
+                "Item count exceeds the limit of {}".format(limits.max_items)
+            )
+        self._allocate(length * (2 * _SLOT_SIZE if pairs else _SLOT_SIZE))
+
+    def _bounded(self):
+        return True
+
+    def _underflow(self, n):
+        raise InvalidCborError(
+            "Expected {} bytes, got {} bytes instead".format(
+                n, len(self.data) - self.pos
+            )
+        )
+
+
+class LazyItem(object):
+    """A list or map left undecoded by a lazy BufferDecoder.
+
+    Holds the span of the item in the source buffer, so the buffer must not
+    be modified while the item is in use. The item is decoded on first use
+    and behaves like the decoded list or map for len(), iteration, indexing
+    and membership tests. Encoders write the span back unchanged.
+
+    preserve_raw marks spans whose encoding registry items decoded from them
+    keep, as from_cbor(preserve_raw=True) does.
+    """
+
+    __slots__ = (
+        "data",
+        "offset",
+        "length",
+        "zero_copy",
+        "limits",
+        "preserve_raw",
+        "_value",
+    )
+
+    def __init__(
+        self, data, offset, length, zero_copy=False, limits=None, preserve_raw=False
+    ):
+        self.data = data
+        self.offset = offset
+        self.length = length
+        self.zero_copy = zero_copy
+        self.limits = limits
+        self.preserve_raw = preserve_raw
+        self._value = None
+
+    def value(self):
+        if self._value is None:
+            self._value = BufferDecoder(
+                self.data,
+                self.offset,
+                zero_copy=self.zero_copy,
+                lazy=True,
+                limits=self.limits,
+                preserve_raw=self.preserve_raw,
+            ).decode()
+        return self._value
+
+    def raw(self):
+        return self.data[self.offset : self.offset + self.length]
+
+    def __len__(self):
+        return len(self.value())
+
+    def __iter__(self):
+        return iter(self.value())
+
+    def __getitem__(self, key):
+        return self.value()[key]
+
+    def __contains__(self, key):
+        return key in self.value()
+
+    def __eq__(self, other):
+        if isinstance(other, LazyItem):
+            other = other.value()
+        return self.value() == other
+
+
+class IncrementalDecoder(BufferDecoder):
+    """Decodes top-level CBOR items from chunks of bytes as they arrive.
 
-__all__ = ["InvalidCborError", "Decoder"]
+    feed() returns the items completed by each chunk, in order, and also
+    passes each of them to callback if one is given. An item cut off at a
+    chunk boundary, even in the middle of a header or a bytestring, is kept
+    along with the containers already decoded around it until enough bytes
+    have been fed to finish it.
+    """
+
+    def __init__(self, callback=None, zero_copy=False, limits=None):
+        super().__init__(b"", zero_copy=zero_copy, limits=limits)
+        self.callback = callback
+        self._chunks = []
+        self._buffered = 0
+        self._needed = 0
+
+    def feed(self, chunk):
+        # Chunks are copied since callers may reuse their receive buffers.
+        chunk = bytes(chunk)
+        self._chunks.append(chunk)
+        self._buffered += len(chunk)
+        if self._buffered < self._needed:
+            return []
+        self.data = memoryview(bytes(self.data[self.pos :]) + b"".join(self._chunks))
+        self.pos = 0
+        self._chunks = []
+        self._buffered = 0
+        self._needed = 0
+
+        items = []
+        while self.pos < len(self.data) or self._suspended is not None:
+            try:
+                item = self.decode()
+            except _Incomplete:
+                break
+            items.append(item)
+            if self.callback is not None:
+                self.callback(item)
+        return items
+
+    def pending(self):
+        return (
+            self._suspended is not None
+            or self.pos < len(self.data)
+            or self._buffered > 0
+        )
+
+    def close(self):
+        if self.pending():
+            raise InvalidCborError("Incomplete CBOR item at end of input")
+
+    def _underflow(self, n):
+        self._needed = self.pos + n - len(self.data)
+        raise _Incomplete()
+
+    def _bounded(self):
+        return False
 
 
 def from_bytes(val):
     return int.from_bytes(val, "big")
+
+
+def _in_container(kind, stack):
+    if kind == _LIST or kind == _DICT:
+        return True
+    for frame in stack:
+        if frame[0] == _LIST or frame[0] == _DICT:
+            return True
+    return False
+
+
+def _header(data, pos, end):
+    if pos >= end:
+        raise InvalidCborError("Expected 1 bytes, got 0 bytes instead")
+    ibyte = data[pos]
+    pos += 1
+    ainfo = ibyte & 0b00011111
+    if ainfo < 24:
+        return ibyte, ainfo, pos
+    if ainfo < 28 and ibyte != 0xF8:
+        size = 1 << (ainfo - 24)
+        if pos + size > end:
+            raise InvalidCborError(
+                "Expected {} bytes, got {} bytes instead".format(size, end - pos)
+            )
+        return ibyte, from_bytes(data[pos : pos + size]), pos + size
+    if ainfo == 31 and (0x40 <= ibyte < 0xC0 or ibyte == 0xFF):
+        return ibyte, None, pos
+    raise InvalidCborError("Invalid additional information {}".format(ainfo))
+
+
+def _skip(data, pos, max_depth=MAX_DEPTH):
+    # Returns the offset just past the item starting at pos, reading only
+    # headers. pending counts the items left in the innermost open container
+    # (None if its length is indefinite), starting with the item itself.
+    end = len(data)
+    pending = 1
+    stack = []
+    while True:
+        ibyte, length, pos = _header(data, pos, end)
+        major = ibyte >> 5
+        if ibyte == 0xFF:
+            if pending is not None:
+                raise _Break()
+            pending = stack.pop()
+        elif length is None or ((major == 4 or major == 5) and length > 0):
+            if max_depth is not None and len(stack) >= max_depth:
+                raise InvalidCborError(
+                    "Maximum nesting depth {} exceeded".format(max_depth)
+                )
+            stack.append(pending)
+            pending = length if major != 5 or length is None else 2 * length
+            continue
+        elif major == 6:
+            continue
+        elif major == 2 or major == 3:
+            pos += length
+            if pos > end:
+                raise InvalidCborError(
+                    "Expected {} bytes, got {} bytes instead".format(
+                        length, end - pos + length
+                    )
+                )
+
+        while pending is not None:
+            pending -= 1
+            if pending:
+                break
+            if not stack:
+                return pos
+            pending = stack.pop()
+
+
+# Handlers for each initial byte, called as handler(decoder, ibyte). Lengths
+# below 24 are encoded in the initial byte itself, so the handlers for those
+# take the value straight from it without touching the additional info.
+
+
+def _small_uint(decoder, ibyte):
+    return ibyte
+
+
+def _uint8(decoder, ibyte):
+    return decoder._read_byte()
+
+
+def _uint(decoder, ibyte):
+    return from_bytes(decoder._read(1 << ((ibyte & 0b00011111) - 24)))
+
+
+def _small_nint(decoder, ibyte):
+    return 0x1F - ibyte
+
+
+def _nint8(decoder, ibyte):
+    return -1 - decoder._read_byte()
+
+
+def _nint(decoder, ibyte):
+    return -1 - from_bytes(decoder._read(1 << ((ibyte & 0b00011111) - 24)))
+
+
+def _small_bytestring(decoder, ibyte):
+    return decoder._read_bytes(ibyte - 0x40)
+
+
+def _bytestring(decoder, ibyte):
+    return decoder._read_bytes(_uint(decoder, ibyte))
+
+
+def _small_textstring(decoder, ibyte):
+    return decoder._read_text(ibyte - 0x60)
+
+
+def _textstring(decoder, ibyte):
+    return decoder._read_text(_uint(decoder, ibyte))
+
+
+def _indefinite_bytestring(decoder, ibyte):
+    return decoder.decode_bytestring(2, 31)
+
+
+def _indefinite_textstring(decoder, ibyte):
+    return decoder.decode_textstring(3, 31)
+
+
+def _list(decoder, ibyte):
+    return decoder.decode_list(4, ibyte & 0b00011111)
+
+
+def _dict(decoder, ibyte):
+    return decoder.decode_dict(5, ibyte & 0b00011111)
+
+
+def _tagging(decoder, ibyte):
+    return decoder.decode_tagging(6, ibyte & 0b00011111)
+
+
+def _false(decoder, ibyte):
+    return False
+
+
+def _true(decoder, ibyte):
+    return True
+
+
+def _null(decoder, ibyte):
+    return None
+
+
+def _undefined(decoder, ibyte):
+    return Undefined
+
+
+def _half_float(decoder, ibyte):
+    return decoder.decode_half_float(7, 25)
+
+
+def _single_float(decoder, ibyte):
+    return decoder.decode_single_float(7, 26)
+
+
+def _double_float(decoder, ibyte):
+    return decoder.decode_double_float(7, 27)
+
+
+def _break(decoder, ibyte):
+    raise _Break()
+
+
+def _invalid(decoder, ibyte):
+    raise InvalidCborError(
+        "Invalid additional information {}".format(ibyte & 0b00011111)
+    )
+
+
+def _build_dispatch_table():
+    table = [_invalid] * 256
+    for ainfo in range(24):
+        table[ainfo] = _small_uint
+        table[0x20 | ainfo] = _small_nint
+        table[0x40 | ainfo] = _small_bytestring
+        table[0x60 | ainfo] = _small_textstring
+    for ainfo in range(24, 28):
+        table[ainfo] = _uint
+        table[0x20 | ainfo] = _nint
+        table[0x40 | ainfo] = _bytestring
+        table[0x60 | ainfo] = _textstring
+    table[0x18] = _uint8
+    table[0x38] = _nint8
+    table[0x5F] = _indefinite_bytestring
+    table[0x7F] = _indefinite_textstring
+    for ainfo in list(range(28)) + [31]:
+        table[0x80 | ainfo] = _list
+        table[0xA0 | ainfo] = _dict
+    for ainfo in range(28):
+        table[0xC0 | ainfo] = _tagging
+    for ainfo in range(20):
+        table[0xE0 | ainfo] = _null
+    table[0xF4] = _false
+    table[0xF5] = _true
+    table[0xF6] = _null
+    table[0xF7] = _undefined
+    table[0xF9] = _half_float
+    table[0xFA] = _single_float
+    table[0xFB] = _double_float
+    table[0xFF] = _break
+    return table
+
+
+_DISPATCH = _build_dispatch_table()
+
+__all__ = [
+    "InvalidCborError",
+    "Decoder",
+    "BufferDecoder",
+    "IncrementalDecoder",
+    "LazyItem",
+    "Limits",
+]
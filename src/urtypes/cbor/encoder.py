@@ -26,9 +26,10 @@
 import struct
 
 _str_type = type("")
-_bytes_type = type(b"")
+_bytes_type = (bytes, bytearray, memoryview)
 
-from .data import Tagging, Mapping, Undefined
+from .data import Tagging, Mapping, DataItem, Undefined, _Undefined
+from .decoder import LazyItem
 
 
 class EncoderError(Exception):
@@ -36,8 +37,17 @@ class EncoderError(Exception):
 
 
 class Encoder(object):
-    def __init__(self, output):
+    """Encodes values to a stream.
+
+    If canonical is true, the output follows the core deterministic encoding
+    requirements of RFC 8949: map keys are sorted by their encodings, and
+    floats take the shortest form that holds their value. LazyItem spans are
+    then decoded and encoded again rather than copied.
+    """
+
+    def __init__(self, output, canonical=False):
         self.output = output
+        self.canonical = canonical
 
     def encode(self, val):
         if isinstance(val, _bytes_type):
@@ -63,6 +73,11 @@ class Encoder(object):
         elif isinstance(val, Mapping):
             val = val.map
             self.encode(val)
+        elif isinstance(val, LazyItem):
+            if self.canonical:
+                self.encode(val.value())
+            else:
+                self._write(val.raw())
         else:
             raise EncoderError("val of type {} is not serializable".format(type(val)))
 
@@ -73,6 +88,11 @@ class Encoder(object):
 
     def encode_dict(self, dict):
         self._write(_encode_ibyte(5, len(dict)))
+        if self.canonical:
+            for key, value in _sorted_items(dict):
+                self._write(key)
+                self.encode(value)
+            return
         for key, value in dict.items():
             self.encode(key)
             self.encode(value)
@@ -87,6 +107,9 @@ class Encoder(object):
         self._write(string_)
 
     def encode_float(self, float):
+        if self.canonical:
+            self._write(_shortest_float(float))
+            return
         self._write(b"\xfb")
         self._write(struct.pack(">d", float))
 
@@ -128,23 +151,447 @@ class Encoder(object):
     def encode_undefined(self):
         self._write(b"\xf7")
 
+    def encode_header(self, major, length):
+        self._write(_encode_ibyte(major, length))
+
     def _write(self, val):
         self.output.write(val)
 
 
+class BufferEncoder(Encoder):
+    """Encodes into a single buffer rather than a stream.
+
+    By default output is a bytearray that grows as values are appended. If
+    output is a list, each encoded piece is appended to it unchanged, so the
+    pieces can be joined into bytes with a single copy. If an offset is
+    given, output must be a writable buffer, which is filled from offset
+    without being resized: pos tracks the end of the data written, and
+    running out of room raises EncoderError.
+
+    The write method of the output stands in for _write, so each write is a
+    direct call rather than a method call into a stream.
+    """
+
+    def __init__(self, output=None, offset=None, canonical=False):
+        super().__init__(bytearray() if output is None else output, canonical)
+        if offset is not None:
+            self.pos = offset
+            self._view = memoryview(self.output)
+            self._write = self._write_into
+        elif isinstance(self.output, list):
+            self._write = self.output.append
+        else:
+            self._write = self.output.extend
+
+    def encode(self, val):
+        # Values are dispatched on their exact type, and containers push their
+        # contents onto a stack of values still to be written instead of
+        # recursing into them.
+        encoders = _ENCODERS
+        stack = [val]
+        while stack:
+            val = stack.pop()
+            try:
+                handler = encoders[type(val)]
+            except KeyError:
+                handler = _find_encoder(val)
+            handler(self, val, stack)
+
+    def _write_into(self, val):
+        pos = self.pos
+        end = pos + len(val)
+        if end > len(self._view):
+            raise EncoderError("Output buffer is too small")
+        self._view[pos:end] = val
+        self.pos = end
+
+
+class StreamEncoder(BufferEncoder):
+    """Encodes by passing chunks of at most chunk_size bytes to write.
+
+    Small writes are gathered in a buffer, and large bytestrings are passed
+    on as memoryview slices, so memory use is bounded by chunk_size however
+    large the encoded value is. flush() must be called after the last value
+    has been encoded.
+    """
+
+    def __init__(self, write, chunk_size=65536, canonical=False):
+        super().__init__(canonical=canonical)
+        self.sink = write
+        self.chunk_size = chunk_size
+        self._write = self._write_chunked
+
+    def flush(self):
+        if self.output:
+            self.sink(bytes(self.output))
+            del self.output[:]
+
+    def _write_chunked(self, val):
+        buffer = self.output
+        size = self.chunk_size
+        if len(buffer) + len(val) < size:
+            buffer.extend(val)
+            return
+        view = memoryview(val)
+        pos = size - len(buffer)
+        buffer.extend(view[:pos])
+        self.flush()
+        end = len(view)
+        while end - pos >= size:
+            self.sink(view[pos : pos + size])
+            pos += size
+        buffer.extend(view[pos:])
+
+
+def _encode_int(encoder, val, stack):
+    if 0 <= val < 256:
+        encoder._write(_HEADERS[val])
+    else:
+        encoder.encode_integer(val)
+
+
+def _encode_bool(encoder, val, stack):
+    encoder._write(b"\xf5" if val else b"\xf4")
+
+
+def _encode_bytes(encoder, val, stack):
+    encoder._write(_encode_ibyte(2, len(val)))
+    encoder._write(val)
+
+
+def _encode_str(encoder, val, stack):
+    encoder.encode_textstring(val)
+
+
+def _encode_float(encoder, val, stack):
+    encoder.encode_float(val)
+
+
+def _encode_null(encoder, val, stack):
+    encoder._write(b"\xf6")
+
+
+def _encode_undefined(encoder, val, stack):
+    encoder._write(b"\xf7")
+
+
+def _encode_list(encoder, val, stack):
+    encoder._write(_encode_ibyte(4, len(val)))
+    stack.extend(reversed(val))
+
+
+def _encode_dict(encoder, val, stack):
+    encoder._write(_encode_ibyte(5, len(val)))
+    if encoder.canonical:
+        for key, value in reversed(_sorted_items(val)):
+            stack.append(value)
+            stack.append(key)
+        return
+    for key, value in reversed(list(val.items())):
+        stack.append(value)
+        stack.append(key)
+
+
+def _encode_tagging(encoder, val, stack):
+    header = _encode_ibyte(6, val.tag)
+    if header is None:
+        raise EncoderError(
+            "Encoding tag larger than 18446744073709551615 is not supported"
+        )
+    encoder._write(header)
+    stack.append(val.obj)
+
+
+def _encode_data_item(encoder, val, stack):
+    map = val.obj
+    if type(map) is not DataItem:
+        header = _encode_ibyte(6, val.tag)
+        if header is None:
+            raise EncoderError(
+                "Encoding tag larger than 18446744073709551615 is not supported"
+            )
+        encoder._write(header)
+        stack.append(map)
+        return
+    # Tags nested directly in each other, such as the script expressions
+    # around the key of an output, are written as one cached prefix.
+    tags = [val.tag]
+    while type(map) is DataItem and len(tags) < _MAX_CHAIN_LENGTH:
+        tags.append(map.tag)
+        map = map.obj
+    encoder._write(_tag_prefix(tuple(tags)))
+    stack.append(map)
+
+
+# The encoded headers of each chain of tags written so far. Only a handful of
+# chains occur in practice, but the table is capped in case of more.
+_TAG_PREFIXES = {}
+_MAX_TAG_PREFIXES = 256
+_MAX_CHAIN_LENGTH = 8
+
+
+def _tag_prefix(tags):
+    prefix = _TAG_PREFIXES.get(tags)
+    if prefix is None:
+        headers = [_encode_ibyte(6, tag) for tag in tags]
+        if None in headers:
+            raise EncoderError(
+                "Encoding tag larger than 18446744073709551615 is not supported"
+            )
+        prefix = b"".join(headers)
+        if len(_TAG_PREFIXES) < _MAX_TAG_PREFIXES:
+            _TAG_PREFIXES[tags] = prefix
+    return prefix
+
+
+def _encode_mapping(encoder, val, stack):
+    stack.append(val.map)
+
+
+def _encode_lazy_item(encoder, val, stack):
+    if encoder.canonical:
+        stack.append(val.value())
+    else:
+        encoder._write(val.raw())
+
+
+class _Encoded(bytes):
+    # Bytes that are already CBOR, written out as they are.
+    pass
+
+
+def _encode_encoded(encoder, val, stack):
+    encoder._write(val)
+
+
+class _Array:
+    # An array of length values, which are taken from an iterable, such as a
+    # generator, only as each one is encoded.
+    __slots__ = ("length", "values")
+
+    def __init__(self, length, values):
+        self.length = length
+        self.values = values
+
+
+def _encode_array(encoder, val, stack):
+    encoder._write(_encode_ibyte(4, val.length))
+    for value in val.values:
+        encoder.encode(value)
+
+
+def _sorted_items(dict):
+    # Returns (encoded key, value) pairs in the bytewise order of the keys'
+    # canonical encodings.
+    items = []
+    for key, value in dict.items():
+        key_encoder = BufferEncoder(canonical=True)
+        key_encoder.encode(key)
+        items.append((_Encoded(key_encoder.output), value))
+    items.sort(key=lambda item: item[0])
+    return items
+
+
+def _shortest_float(val):
+    for ibyte, format in ((b"\xf9", ">e"), (b"\xfa", ">f")):
+        try:
+            packed = struct.pack(format, val)
+        except (OverflowError, struct.error):
+            continue
+        unpacked = struct.unpack(format, packed)[0]
+        if unpacked == val or (unpacked != unpacked and val != val):
+            return ibyte + packed
+    return b"\xfb" + struct.pack(">d", val)
+
+
+_ENCODERS = {
+    int: _encode_int,
+    bool: _encode_bool,
+    bytes: _encode_bytes,
+    bytearray: _encode_bytes,
+    memoryview: _encode_bytes,
+    str: _encode_str,
+    float: _encode_float,
+    type(None): _encode_null,
+    _Undefined: _encode_undefined,
+    list: _encode_list,
+    dict: _encode_dict,
+    Tagging: _encode_tagging,
+    DataItem: _encode_data_item,
+    Mapping: _encode_mapping,
+    LazyItem: _encode_lazy_item,
+    _Encoded: _encode_encoded,
+    _Array: _encode_array,
+}
+
+
+def _find_encoder(val):
+    # Subclasses of the supported types are encoded like their nearest base.
+    for base in type(val).__mro__:
+        if base in _ENCODERS:
+            return _ENCODERS[base]
+    raise EncoderError("val of type {} is not serializable".format(type(val)))
+
+
+def encoded_size(val):
+    """Returns the length of the CBOR encoding of val without encoding it."""
+    sizers = _SIZERS
+    size = 0
+    stack = [val]
+    while stack:
+        val = stack.pop()
+        try:
+            sizer = sizers[type(val)]
+        except KeyError:
+            sizer = _find_sizer(val)
+        size += sizer(val, stack)
+    return size
+
+
+def _size_int(val, stack):
+    if val < 0:
+        size = _ibyte_size(-val - 1)
+        if size is None:
+            raise EncoderError(
+                "Encoding integers lower than -18446744073709551616 is not supported"
+            )
+    else:
+        size = _ibyte_size(val)
+        if size is None:
+            raise EncoderError(
+                "Encoding integers larger than 18446744073709551615 is not supported"
+            )
+    return size
+
+
+def _size_simple(val, stack):
+    return 1
+
+
+def _size_bytes(val, stack):
+    length = len(val)
+    return _ibyte_size(length) + length
+
+
+def _size_str(val, stack):
+    length = len(val.encode("utf-8"))
+    return _ibyte_size(length) + length
+
+
+def _size_float(val, stack):
+    return 9
+
+
+def _size_list(val, stack):
+    stack.extend(val)
+    return _ibyte_size(len(val))
+
+
+def _size_dict(val, stack):
+    for key, value in val.items():
+        stack.append(key)
+        stack.append(value)
+    return _ibyte_size(len(val))
+
+
+def _size_tagging(val, stack):
+    size = _ibyte_size(val.tag)
+    if size is None:
+        raise EncoderError(
+            "Encoding tag larger than 18446744073709551615 is not supported"
+        )
+    stack.append(val.obj)
+    return size
+
+
+def _size_data_item(val, stack):
+    size = _ibyte_size(val.tag)
+    if size is None:
+        raise EncoderError(
+            "Encoding tag larger than 18446744073709551615 is not supported"
+        )
+    stack.append(val.map)
+    return size
+
+
+def _size_mapping(val, stack):
+    stack.append(val.map)
+    return 0
+
+
+def _size_lazy_item(val, stack):
+    return val.length
+
+
+_SIZERS = {
+    int: _size_int,
+    bool: _size_simple,
+    bytes: _size_bytes,
+    bytearray: _size_bytes,
+    memoryview: _size_bytes,
+    str: _size_str,
+    float: _size_float,
+    type(None): _size_simple,
+    _Undefined: _size_simple,
+    list: _size_list,
+    dict: _size_dict,
+    Tagging: _size_tagging,
+    DataItem: _size_data_item,
+    Mapping: _size_mapping,
+    LazyItem: _size_lazy_item,
+}
+
+
+def _find_sizer(val):
+    for base in type(val).__mro__:
+        if base in _SIZERS:
+            return _SIZERS[base]
+    raise EncoderError("val of type {} is not serializable".format(type(val)))
+
+
+def _build_headers():
+    headers = []
+    for major in range(8):
+        for length in range(256):
+            if length < 24:
+                headers.append(bytes(((major << 5) | length,)))
+            else:
+                headers.append(bytes(((major << 5) | 24, length)))
+    return headers
+
+
+# Initial bytes for every major type with a length of 0 to 255, indexed by
+# major << 8 | length.
+_HEADERS = _build_headers()
+
+
 def _encode_ibyte(major, length):
+    if length < 256:
+        return _HEADERS[major << 8 | length]
+    elif length < 65536:
+        return bytes(((major << 5) | 25,)) + length.to_bytes(2, "big")
+    elif length < 4294967296:
+        return bytes(((major << 5) | 26,)) + length.to_bytes(4, "big")
+    elif length < 18446744073709551616:
+        return bytes(((major << 5) | 27,)) + length.to_bytes(8, "big")
+    else:
+        return None
+
+
+def _ibyte_size(length):
+    # Must agree with the header lengths chosen by _encode_ibyte.
     if length < 24:
-        return struct.pack(">B", (major << 5) | length)
+        return 1
     elif length < 256:
-        return struct.pack(">BB", (major << 5) | 24, length)
+        return 2
     elif length < 65536:
-        return struct.pack(">BH", (major << 5) | 25, length)
+        return 3
     elif length < 4294967296:
-        return struct.pack(">BI", (major << 5) | 26, length)
+        return 5
     elif length < 18446744073709551616:
-        return struct.pack(">BQ", (major << 5) | 27, length)
+        return 9
     else:
         return None
 
 
-__all__ = ["Encoder", "EncoderError"]
+__all__ = ["Encoder", "BufferEncoder", "StreamEncoder", "EncoderError", "encoded_size"]
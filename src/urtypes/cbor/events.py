@@ -0,0 +1,146 @@
+# The MIT License (MIT)
+
+# Copyright (c) 2021 Tom J. Sun
+# Copyright (c) 2015 Sokolov Yura
+# Copyright (c) 2013 Fritz Grimpen
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+from .decoder import BufferDecoder, InvalidCborError, _Break, _header, MAX_DEPTH
+from .data import Undefined
+
+INT = 0
+BYTES = 1
+TEXT = 2
+START_ARRAY = 3
+START_MAP = 4
+TAG = 5
+SIMPLE = 6
+FLOAT = 7
+END = 8
+
+_SIMPLE_VALUES = {20: False, 21: True, 22: None, 23: Undefined}
+
+
+def iter_events(data, offset=0, max_depth=MAX_DEPTH):
+    """Walks the CBOR items in data without building them.
+
+    Yields (event, value, offset) tuples, where offset is the position of the
+    item's header in data:
+
+    - INT with the integer value.
+    - BYTES or TEXT with a memoryview of the payload in data. Indefinite-length
+      strings start with a value of None and are followed by their chunks and
+      an END event.
+    - START_ARRAY or START_MAP with the number of items or pairs, or None for
+      indefinite lengths, followed by the contents and an END event.
+    - TAG with the tag number, followed by the tagged item.
+    - SIMPLE with False, True, None or Undefined, and FLOAT with a float.
+
+    Items are read until the end of data, so a CBOR sequence yields the events
+    of each of its items in turn.
+    """
+    data = memoryview(data)
+    end = len(data)
+    pos = offset
+    # pending counts the items left in the innermost open container, or is
+    # None at the top level and inside indefinite-length containers.
+    pending = None
+    chunks = None
+    stack = []
+    # Set while a tag waits for its item, which must follow even at the top
+    # level.
+    tagged = False
+    while pos < end or stack or tagged:
+        start = pos
+        ibyte, length, pos = _header(data, pos, end)
+        major = ibyte >> 5
+        tagged = major == 6
+        if chunks is not None and ibyte != 0xFF and (major != chunks or length is None):
+            raise InvalidCborError(
+                "Invalid chunk of major type {} in indefinite-length string".format(
+                    major
+                )
+            )
+
+        if major == 0:
+            yield INT, length, start
+        elif major == 1:
+            yield INT, -1 - length, start
+        elif major == 2 or major == 3:
+            event = BYTES if major == 2 else TEXT
+            if length is None:
+                yield event, None, start
+                stack.append(pending)
+                pending = None
+                chunks = major
+                continue
+            if pos + length > end:
+                raise InvalidCborError(
+                    "Expected {} bytes, got {} bytes instead".format(length, end - pos)
+                )
+            yield event, data[pos : pos + length], start
+            pos += length
+        elif major == 4 or major == 5:
+            yield (START_ARRAY if major == 4 else START_MAP), length, start
+            if length != 0:
+                if max_depth is not None and len(stack) >= max_depth:
+                    raise InvalidCborError(
+                        "Maximum nesting depth {} exceeded".format(max_depth)
+                    )
+                stack.append(pending)
+                pending = length if major == 4 or length is None else 2 * length
+                continue
+            yield END, None, pos
+        elif major == 6:
+            yield TAG, length, start
+            continue
+        elif ibyte == 0xFF:
+            if pending is not None or not stack:
+                raise _Break()
+            yield END, None, pos
+            pending = stack.pop()
+            chunks = None
+        elif ibyte < 0xF4:
+            yield SIMPLE, None, start
+        elif ibyte < 0xF8:
+            yield SIMPLE, _SIMPLE_VALUES[length], start
+        else:
+            yield FLOAT, BufferDecoder(data, start).decode(), start
+
+        while pending is not None:
+            pending -= 1
+            if pending:
+                break
+            yield END, None, pos
+            pending = stack.pop()
+
+
+__all__ = [
+    "INT",
+    "BYTES",
+    "TEXT",
+    "START_ARRAY",
+    "START_MAP",
+    "TAG",
+    "SIMPLE",
+    "FLOAT",
+    "END",
+    "iter_events",
+]
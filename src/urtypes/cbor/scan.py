@@ -0,0 +1,121 @@
+# The MIT License (MIT)
+
+# Copyright (c) 2021 Tom J. Sun
+# Copyright (c) 2015 Sokolov Yura
+# Copyright (c) 2013 Fritz Grimpen
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+from .decoder import (
+    BufferDecoder,
+    InvalidCborError,
+    _header,
+    _skip,
+    MAX_DEPTH,
+    DEFAULT_LIMITS,
+)
+
+
+def skip(data, offset=0, max_depth=MAX_DEPTH):
+    """Returns the offset just past the item at offset, reading only headers."""
+    return _skip(memoryview(data), offset, max_depth)
+
+
+def find(data, path, offset=0, max_depth=MAX_DEPTH):
+    """Locates the item at path without decoding the items around it.
+
+    Each element of path is a map key or an array index, applied in turn
+    starting from the item at offset. Tags are stepped through as if they
+    were not there. Returns the (start, end) span of the item in data, and
+    raises KeyError or IndexError if the path does not exist.
+    """
+    data = memoryview(data)
+    end = len(data)
+    decoder = BufferDecoder(data)
+    pos = offset
+    for key in path:
+        ibyte, length, pos = _header(data, pos, end)
+        while ibyte >> 5 == 6:
+            ibyte, length, pos = _header(data, pos, end)
+        major = ibyte >> 5
+        if major == 4 and isinstance(key, int):
+            if key < 0:
+                raise IndexError(key)
+            for n in range(key + 1):
+                if _at_end(data, pos, length, n):
+                    raise IndexError(key)
+                if n < key:
+                    pos = _skip(data, pos, max_depth)
+        elif major == 5:
+            n = 0
+            while True:
+                if _at_end(data, pos, length, n):
+                    raise KeyError(key)
+                decoder.pos = pos
+                if decoder.decode() == key:
+                    pos = decoder.pos
+                    break
+                pos = _skip(data, decoder.pos, max_depth)
+                n += 1
+        else:
+            raise KeyError(key)
+    return pos, _skip(data, pos, max_depth)
+
+
+def array_offsets(data, offset=0, max_depth=MAX_DEPTH):
+    """Returns where each item of the array at offset starts, then its end.
+
+    Tags on the array are stepped through. The items are found from their
+    headers, so the span between two consecutive offsets can be decoded on
+    its own, and a run of them forms a CBOR sequence.
+    """
+    data = memoryview(data)
+    end = len(data)
+    ibyte, length, pos = _header(data, offset, end)
+    while ibyte >> 5 == 6:
+        ibyte, length, pos = _header(data, pos, end)
+    if ibyte >> 5 != 4:
+        raise InvalidCborError("Expected an array at offset {}".format(offset))
+    offsets = []
+    n = 0
+    while not _at_end(data, pos, length, n):
+        offsets.append(pos)
+        pos = _skip(data, pos, max_depth)
+        n += 1
+    offsets.append(pos)
+    return offsets
+
+
+def _at_end(data, pos, length, n):
+    # Whether a container of the given length ends before its nth item.
+    if length is not None:
+        return n >= length
+    if pos >= len(data):
+        raise InvalidCborError("Expected 1 bytes, got 0 bytes instead")
+    return data[pos] == 0xFF
+
+
+def extract(data, path, offset=0, zero_copy=False, limits=None):
+    """Decodes only the item at path. See find() for how path is applied."""
+    limits = limits if limits is not None else DEFAULT_LIMITS
+    start, _ = find(data, path, offset, limits.max_depth)
+    return BufferDecoder(data, start, zero_copy=zero_copy, limits=limits).decode()
+
+
+__all__ = ["skip", "find", "extract", "array_offsets"]
@@ -20,12 +20,55 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 
-from .account import *
-from .bip39 import *
-from .coin_info import *
-from .ec_key import *
-from .hd_key import *
-from .keypath import *
-from .multi_key import *
-from .output import *
-from .psbt import *
+
+# The type modules, each imported when one of the names in its __all__ is
+# first accessed. Names not seen yet are looked for in this order, so the
+# modules with the fewest dependencies come first.
+_MODULES = (
+    "psbt",
+    "coin_info",
+    "bip39",
+    "ec_key",
+    "keypath",
+    "hd_key",
+    "multi_key",
+    "output",
+    "account",
+)
+
+
+def _import(module):
+    # Imports a submodule by a relative name, as "from . import module" does.
+    return __import__(module, globals(), None, ("__name__",), 1)
+
+
+def _import_all():
+    # Imports every type module, which registers their classes, and returns
+    # the names they define.
+    names = []
+    for module in _MODULES:
+        names.extend(_import(module).__all__)
+    return names
+
+
+def __getattr__(name):
+    if name in _MODULES:
+        return _import(name)
+    if name == "__all__":
+        value = _import_all()
+    else:
+        for module in _MODULES:
+            module = _import(module)
+            if name in module.__all__:
+                value = getattr(module, name)
+                break
+        else:
+            raise AttributeError(
+                "module {!r} has no attribute {!r}".format(__name__, name)
+            )
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__getattr__("__all__")))
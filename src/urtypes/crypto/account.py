@@ -20,19 +20,29 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 
-from urtypes import RegistryType, RegistryItem
+from urtypes import RegistryType, RegistryItem, DeferredAttribute, defer
+from urtypes.cbor import LazyItem
+from urtypes.cbor.encoder import _Array
 from .output import Output
 
 CRYPTO_ACCOUNT = RegistryType("crypto-account", 311)
 
 
 class Account(RegistryItem):
+    __slots__ = ("master_fingerprint", "_output_descriptors")
+
+    output_descriptors = DeferredAttribute("_output_descriptors")
+
     def __init__(self, master_fingerprint, output_descriptors):
         super().__init__()
         self.master_fingerprint = master_fingerprint
         self.output_descriptors = output_descriptors
 
+    __hash__ = RegistryItem.__hash__
+
     def __eq__(self, o):
+        if self._hash_differs(o):
+            return False
         return (
             self.master_fingerprint == o.master_fingerprint
             and self.output_descriptors == o.output_descriptors
@@ -43,18 +53,53 @@ class Account(RegistryItem):
         return CRYPTO_ACCOUNT
 
     def to_data_item(self):
+        return self._map(_descriptor_list)
+
+    def _encode_stream(self, cbor_encoder):
+        # Descriptors are turned into data items one at a time as they are
+        # encoded, rather than all at once by to_data_item().
+        if self._memoized:
+            return super()._encode_stream(cbor_encoder)
+        cbor_encoder.encode(self._map(_descriptor_stream))
+
+    def _parallel_encodable(self, workers, executor):
+        if self._memoized:
+            return self._encodable()
+        from urtypes.parallel import _array
+
+        return self._map(lambda descriptors: _array(descriptors, workers, executor))
+
+    def _map(self, descriptors):
+        # descriptors gives the value of key 2 from the output descriptors.
         map = {}
         if self.master_fingerprint is not None:
             map[1] = int.from_bytes(self.master_fingerprint, "big")
         if self.output_descriptors is not None:
-            map[2] = [
-                descriptor.to_data_item() for descriptor in self.output_descriptors
-            ]
+            map[2] = descriptors(self.output_descriptors)
         return map
 
     @classmethod
     def from_data_item(cls, item):
         map = cls.mapping(item)
         master_fingerprint = map[1].to_bytes(4, "big") if 1 in map else None
-        outputs = [Output.from_data_item(item) for item in map[2]] if 2 in map else None
-        return cls(master_fingerprint, outputs)
+        outputs = defer(map[2], _outputs_from_data_item) if 2 in map else None
+        return cls(master_fingerprint, outputs)._keep_source(item)
+
+
+def _descriptor_list(descriptors):
+    return [descriptor._encodable() for descriptor in descriptors]
+
+
+def _descriptor_stream(descriptors):
+    return _Array(
+        len(descriptors), (descriptor._encodable() for descriptor in descriptors)
+    )
+
+
+def _outputs_from_data_item(items):
+    if isinstance(items, LazyItem) and not items.preserve_raw:
+        return Output._from_array(items)
+    return [Output.from_data_item(item) for item in items]
+
+
+__all__ = ["CRYPTO_ACCOUNT", "Account"]
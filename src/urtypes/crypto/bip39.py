@@ -26,12 +26,18 @@ CRYPTO_BIP39 = RegistryType("crypto-bip39", 301)
 
 
 class BIP39(RegistryItem):
+    __slots__ = ("words", "lang")
+
     def __init__(self, words, lang):
         super().__init__()
         self.words = words
         self.lang = lang
 
+    __hash__ = RegistryItem.__hash__
+
     def __eq__(self, o):
+        if self._hash_differs(o):
+            return False
         return self.words == o.words and self.lang == o.lang
 
     @classmethod
@@ -47,6 +53,10 @@ class BIP39(RegistryItem):
     @classmethod
     def from_data_item(cls, item):
         map = cls.mapping(item)
-        words = map[1]
+        # A lazy decoder leaves the list of words undecoded.
+        words = list(map[1])
         lang = map[2] if 2 in map else None
-        return cls(words, lang)
+        return cls(words, lang)._keep_source(item)
+
+
+__all__ = ["CRYPTO_BIP39", "BIP39"]
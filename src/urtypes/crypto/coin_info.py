@@ -26,12 +26,18 @@ CRYPTO_COIN_INFO = RegistryType("crypto-coin-info", 305)
 
 
 class CoinInfo(RegistryItem):
+    __slots__ = ("type", "network")
+
     def __init__(self, type, network):
         super().__init__()
         self.type = type
         self.network = network
 
+    __hash__ = RegistryItem.__hash__
+
     def __eq__(self, o):
+        if self._hash_differs(o):
+            return False
         return self.type == o.type and self.network == o.network
 
     @classmethod
@@ -51,4 +57,7 @@ class CoinInfo(RegistryItem):
         map = cls.mapping(item)
         type = map[1] if 1 in map else None
         network = map[2] if 2 in map else None
-        return cls(type, network)
+        return cls(type, network)._keep_source(item)
+
+
+__all__ = ["CRYPTO_COIN_INFO", "CoinInfo"]
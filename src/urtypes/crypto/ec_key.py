@@ -27,13 +27,19 @@ CRYPTO_ECKEY = RegistryType("crypto-eckey", 306)
 
 
 class ECKey(RegistryItem):
+    __slots__ = ("data", "curve", "private_key")
+
     def __init__(self, data, curve, private_key):
         super().__init__()
         self.data = data
         self.curve = curve
         self.private_key = private_key
 
+    __hash__ = RegistryItem.__hash__
+
     def __eq__(self, o):
+        if self._hash_differs(o):
+            return False
         return (
             self.data == o.data
             and self.curve == o.curve
@@ -59,7 +65,10 @@ class ECKey(RegistryItem):
         data = map[3]
         curve = map[1] if 1 in map else None
         private_key = map[2] if 2 in map else None
-        return cls(data, curve, private_key)
+        return cls(data, curve, private_key)._keep_source(item)
 
     def descriptor_key(self):
         return binascii.hexlify(self.data).decode()
+
+
+__all__ = ["CRYPTO_ECKEY", "ECKey"]
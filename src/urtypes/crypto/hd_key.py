@@ -22,7 +22,7 @@
 
 import binascii
 import hashlib
-from urtypes import RegistryType, RegistryItem
+from urtypes import RegistryType, RegistryItem, DeferredAttribute, defer
 from urtypes.cbor import DataItem
 from .coin_info import CoinInfo
 from .keypath import Keypath
@@ -31,6 +31,23 @@ CRYPTO_HDKEY = RegistryType("crypto-hdkey", 303)
 
 
 class HDKey(RegistryItem):
+    __slots__ = (
+        "master",
+        "key",
+        "chain_code",
+        "private_key",
+        "_use_info",
+        "_origin",
+        "_children",
+        "parent_fingerprint",
+        "name",
+        "note",
+    )
+
+    use_info = DeferredAttribute("_use_info")
+    origin = DeferredAttribute("_origin")
+    children = DeferredAttribute("_children")
+
     def __init__(self, props):
         super().__init__()
         self.master = None
@@ -48,7 +65,11 @@ class HDKey(RegistryItem):
         else:
             self.setup_derive_key(props)
 
+    __hash__ = RegistryItem.__hash__
+
     def __eq__(self, o):
+        if self._hash_differs(o):
+            return False
         return (
             self.master == o.master
             and self.key == o.key
@@ -177,15 +198,15 @@ class HDKey(RegistryItem):
                 map[4] = self.chain_code
             if self.use_info is not None:
                 map[5] = DataItem(
-                    self.use_info.registry_type().tag, self.use_info.to_data_item()
+                    self.use_info.registry_type().tag, self.use_info._encodable()
                 )
             if self.origin is not None:
                 map[6] = DataItem(
-                    self.origin.registry_type().tag, self.origin.to_data_item()
+                    self.origin.registry_type().tag, self.origin._encodable()
                 )
             if self.children is not None:
                 map[7] = DataItem(
-                    self.children.registry_type().tag, self.children.to_data_item()
+                    self.children.registry_type().tag, self.children._encodable()
                 )
             if self.parent_fingerprint is not None:
                 map[8] = int.from_bytes(self.parent_fingerprint, "big")
@@ -202,13 +223,13 @@ class HDKey(RegistryItem):
         private_key = map[2] if 2 in map else None
         key = map[3] if 3 in map else None
         chain_code = map[4] if 4 in map else None
-        use_info = CoinInfo.from_data_item(map[5]) if 5 in map else None
-        origin = Keypath.from_data_item(map[6]) if 6 in map else None
-        children = Keypath.from_data_item(map[7]) if 7 in map else None
+        use_info = defer(map[5], CoinInfo.from_data_item) if 5 in map else None
+        origin = defer(map[6], Keypath.from_data_item) if 6 in map else None
+        children = defer(map[7], Keypath.from_data_item) if 7 in map else None
         parent_fingerprint = map[8].to_bytes(4, "big") if 8 in map else None
         name = map[9] if 9 in map else None
         note = map[10] if 10 in map else None
-        return cls(
+        hd_key = cls(
             {
                 "master": master,
                 "private_key": private_key,
@@ -222,6 +243,7 @@ class HDKey(RegistryItem):
                 "note": note,
             }
         )
+        return hd_key._keep_source(item)
 
 
 B58_DIGITS = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
@@ -257,3 +279,13 @@ def encode(b):
 def encode_check(b):
     """Encode bytes to a base58-encoded string with a checksum"""
     return encode(b + double_sha256(b)[0:4])
+
+
+__all__ = [
+    "CRYPTO_HDKEY",
+    "HDKey",
+    "B58_DIGITS",
+    "double_sha256",
+    "encode",
+    "encode_check",
+]
@@ -20,19 +20,25 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 
-from urtypes import RegistryType, RegistryItem
+from urtypes import RegistryType, RegistryItem, Tracked
 
 CRYPTO_KEYPATH = RegistryType("crypto-keypath", 304)
 
 
 class Keypath(RegistryItem):
+    __slots__ = ("components", "source_fingerprint", "depth")
+
     def __init__(self, components, source_fingerprint, depth):
         super().__init__()
         self.components = components
         self.source_fingerprint = source_fingerprint
         self.depth = depth
 
+    __hash__ = RegistryItem.__hash__
+
     def __eq__(self, o):
+        if self._hash_differs(o):
+            return False
         return (
             self.components == o.components
             and self.source_fingerprint == o.source_fingerprint
@@ -85,10 +91,12 @@ class Keypath(RegistryItem):
                     path_components.append(PathComponent(None, hardened))
         source_fingerprint = map[2].to_bytes(4, "big") if 2 in map else None
         depth = map[3] if 3 in map else None
-        return cls(path_components, source_fingerprint, depth)
+        return cls(path_components, source_fingerprint, depth)._keep_source(item)
+
 
+class PathComponent(Tracked):
+    __slots__ = ("index", "hardened", "wildcard")
 
-class PathComponent:
     def __init__(self, index, hardened):
         self.index = index
         self.hardened = hardened
@@ -96,9 +104,15 @@ class PathComponent:
         if self.index and self.index & 0x80000000 != 0:
             raise ValueError("Invalid index - most significant bit cannot be set")
 
+    def __hash__(self):
+        return hash((self.index, self.hardened, self.wildcard))
+
     def __eq__(self, o):
         return (
             self.index == o.index
             and self.hardened == o.hardened
             and self.wildcard == o.wildcard
         )
+
+
+__all__ = ["CRYPTO_KEYPATH", "Keypath", "PathComponent"]
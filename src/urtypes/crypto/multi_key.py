@@ -20,20 +20,26 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 
-from urtypes import RegistryItem
+from urtypes import RegistryItem, REGISTRY_TAG_MAP
 from urtypes.cbor import DataItem
-from .hd_key import HDKey, CRYPTO_HDKEY
-from .ec_key import ECKey, CRYPTO_ECKEY
+from .hd_key import HDKey
+from .ec_key import ECKey
 
 
 class MultiKey(RegistryItem):
+    __slots__ = ("threshold", "ec_keys", "hd_keys")
+
     def __init__(self, threshold, ec_keys, hd_keys):
         super().__init__()
         self.threshold = threshold
         self.ec_keys = ec_keys
         self.hd_keys = hd_keys
 
+    __hash__ = RegistryItem.__hash__
+
     def __eq__(self, o):
+        if self._hash_differs(o):
+            return False
         return (
             self.threshold == o.threshold
             and self.ec_keys == o.ec_keys
@@ -50,7 +56,7 @@ class MultiKey(RegistryItem):
         combined_keys = self.ec_keys[:] + self.hd_keys[:]
         keys = []
         for key in combined_keys:
-            keys.append(DataItem(key.registry_type().tag, key.to_data_item()))
+            keys.append(DataItem(key.registry_type().tag, key._encodable()))
         map[2] = keys
         return map
 
@@ -62,8 +68,12 @@ class MultiKey(RegistryItem):
         ec_keys = []
         hd_keys = []
         for key in keys:
-            if key.tag == CRYPTO_HDKEY.tag:
+            key_cls = REGISTRY_TAG_MAP.get(key.tag)
+            if key_cls is HDKey:
                 hd_keys.append(HDKey.from_data_item(key))
-            elif key.tag == CRYPTO_ECKEY.tag:
+            elif key_cls is ECKey:
                 ec_keys.append(ECKey.from_data_item(key))
-        return cls(threshold, ec_keys, hd_keys)
+        return cls(threshold, ec_keys, hd_keys)._keep_source(map)
+
+
+__all__ = ["MultiKey"]
@@ -21,18 +21,23 @@
 # THE SOFTWARE.
 
 import io
-from urtypes import RegistryType, RegistryItem
-from urtypes.cbor import DataItem
+from urtypes import RegistryType, RegistryItem, Tracked, REGISTRY_TAG_MAP
+from urtypes.cbor import decoder, encoder, DataItem, LazyItem
 from .multi_key import MultiKey
-from .hd_key import HDKey, CRYPTO_HDKEY
+from .hd_key import HDKey
 from .ec_key import ECKey
 
 
-class ScriptExpression:
+class ScriptExpression(Tracked):
+    __slots__ = ("tag", "expression")
+
     def __init__(self, tag, expression):
         self.tag = tag
         self.expression = expression
 
+    def __hash__(self):
+        return hash((self.tag, self.expression))
+
     def __eq__(self, o):
         return self.tag == o.tag and self.expression == o.expression
 
@@ -56,12 +61,18 @@ CRYPTO_OUTPUT = RegistryType("crypto-output", 308)
 
 
 class Output(RegistryItem):
+    __slots__ = ("script_expressions", "crypto_key")
+
     def __init__(self, script_expressions, crypto_key):
         super().__init__()
         self.script_expressions = script_expressions
         self.crypto_key = crypto_key
 
+    __hash__ = RegistryItem.__hash__
+
     def __eq__(self, o):
+        if self._hash_differs(o):
+            return False
         return (
             self.script_expressions == o.script_expressions
             and self.crypto_key == o.crypto_key
@@ -113,45 +124,167 @@ class Output(RegistryItem):
         return None
 
     def to_data_item(self):
-        item = DataItem(None, self.crypto_key.to_data_item())
-        if self.crypto_key.registry_type() is not None:
-            item.tag = self.crypto_key.registry_type().tag
-        i = len(self.script_expressions) - 1
-        while i >= 0:
-            expression = self.script_expressions[i]
-            if item.tag is None:
-                item.tag = expression.tag
-            else:
-                item = DataItem(expression.tag, item)
-            i -= 1
+        tags = self._tags()
+        if not tags:
+            return DataItem(None, self.crypto_key._encodable())
+        item = self.crypto_key._encodable()
+        for tag in reversed(tags):
+            item = DataItem(tag, item)
         return item
 
+    @classmethod
+    def from_cbor(
+        cls, cbor_payload, zero_copy=False, lazy=False, limits=None, preserve_raw=False
+    ):
+        if preserve_raw:
+            return super().from_cbor(
+                cbor_payload, zero_copy, lazy, limits, preserve_raw
+            )
+        return cls._decode(memoryview(cbor_payload), 0, zero_copy, lazy, limits)[0]
+
+    @classmethod
+    def _decode(cls, data, pos, zero_copy, lazy, limits):
+        # Outputs almost always start with a chain of tags that has been seen
+        # before, which is matched as a whole instead of being decoded into
+        # nested DataItems. Returns the output and the offset past it.
+        start = pos
+        while pos < len(data) and 0xC0 <= data[pos] < 0xDC:
+            ainfo = data[pos] & 0x1F
+            pos += 1 if ainfo < 24 else 1 + (1 << (ainfo - 24))
+        tags = _TAG_CHAINS.get(bytes(data[start:pos]))
+        if tags is None:
+            cbor_decoder = decoder.BufferDecoder(
+                data, start, zero_copy=zero_copy, lazy=lazy, limits=limits
+            )
+            output = cls.from_data_item(cbor_decoder.decode())
+            _tag_prefix(output._tags())
+        else:
+            cbor_decoder = decoder.BufferDecoder(
+                data, pos, zero_copy=zero_copy, lazy=lazy, limits=limits
+            )
+            output = cls._from_chain(tags, DataItem(tags[-1], cbor_decoder.decode()))
+        return output, cbor_decoder.pos
+
+    @classmethod
+    def _from_array(cls, item):
+        # Decodes an array of outputs that was left undecoded, matching the
+        # chain of tags of each output. The length of the array is only
+        # charged against the limits when it is decoded as a whole.
+        data = item.data
+        pos = item.offset
+        limits = item.limits or decoder.DEFAULT_LIMITS
+        if (
+            not 0x80 <= data[pos] < 0x9C
+            or limits.max_items is not None
+            or limits.max_allocation is not None
+        ):
+            return [cls.from_data_item(output) for output in item]
+        ainfo = data[pos] & 0x1F
+        pos += 1
+        if ainfo < 24:
+            count = ainfo
+        else:
+            size = 1 << (ainfo - 24)
+            count = int.from_bytes(data[pos : pos + size], "big")
+            pos += size
+        outputs = []
+        for _ in range(count):
+            output, pos = cls._decode(data, pos, item.zero_copy, True, item.limits)
+            outputs.append(output)
+        return outputs
+
     @classmethod
     def from_data_item(cls, item):
         tmp_item = cls.mapping(item)
-        script_expressions = []
+        tags = []
         while True:
             tag = tmp_item.tag
-            if tag in SCRIPT_EXPRESSION_TAG_MAP:
-                script_expressions.append(SCRIPT_EXPRESSION_TAG_MAP[tag])
-                if isinstance(tmp_item.map, DataItem):
-                    tmp_item = tmp_item.map
-                else:
-                    break
+            tags.append(tag)
+            if tag in SCRIPT_EXPRESSION_TAG_MAP and isinstance(tmp_item.map, DataItem):
+                tmp_item = tmp_item.map
             else:
                 break
+        return cls._from_chain(tuple(tags), tmp_item)._keep_source(item)
+
+    @classmethod
+    def _from_chain(cls, tags, key_item):
+        # key_item is the innermost DataItem of the chain of tags.
+        script_expressions = []
+        for tag in tags:
+            if tag not in SCRIPT_EXPRESSION_TAG_MAP:
+                break
+            script_expressions.append(SCRIPT_EXPRESSION_TAG_MAP[tag])
         exp_len = len(script_expressions)
         is_multi_key = exp_len > 0 and (
             script_expressions[exp_len - 1].expression == "multi"
             or script_expressions[exp_len - 1].expression == "sortedmulti"
         )
         if is_multi_key:
-            return cls(script_expressions, MultiKey.from_data_item(tmp_item))
-
-        if tmp_item.tag == CRYPTO_HDKEY.tag:
-            return cls(script_expressions, HDKey.from_data_item(tmp_item))
+            key_cls = MultiKey
+        else:
+            key_cls = REGISTRY_TAG_MAP.get(key_item.tag)
+            if key_cls is not HDKey:
+                key_cls = ECKey
+        return cls(script_expressions, key_cls.from_data_item(key_item))
+
+    def _keep_source(self, item):
+        # An output is encoded as a chain of tags around its key. The tags
+        # are always decoded, so the span of the output is found from the
+        # span of the key, provided the tags in front of it are in their
+        # shortest form. A top-level span is split up the same way.
+        if isinstance(item, LazyItem):
+            if not item.preserve_raw:
+                return self
+            prefix = _tag_prefix(self._tags())
+            data = item.data
+            start = item.offset
+            end = start + item.length
         else:
-            return cls(script_expressions, ECKey.from_data_item(tmp_item))
+            while isinstance(item, DataItem):
+                item = item.map
+            if not isinstance(item, LazyItem) or not item.preserve_raw:
+                return self
+            prefix = _tag_prefix(self._tags())
+            data = item.data
+            start = item.offset - len(prefix)
+            end = item.offset + item.length
+            if start < 0:
+                return self
+        key_start = start + len(prefix)
+        if data[start:key_start] != prefix:
+            return self
+        if self.crypto_key._cbor is None:
+            self.crypto_key._keep_source(
+                LazyItem(data, key_start, end - key_start, preserve_raw=True)
+            )
+        self._seed(data[start:end])
+        return self
+
+    def _tags(self):
+        tags = tuple(expression.tag for expression in self.script_expressions)
+        key_type = self.crypto_key.registry_type()
+        if key_type is not None:
+            tags += (key_type.tag,)
+        return tags
+
+
+# A tagged output begins with the tag of its first script expression.
+for tag in SCRIPT_EXPRESSION_TAG_MAP:
+    REGISTRY_TAG_MAP.setdefault(tag, Output)
+
+
+# The chain of tags for each encoded prefix of tag headers seen by
+# Output.from_cbor. Only a handful of chains occur in practice, but the table
+# is capped since decoding adds any chain it comes across.
+_TAG_CHAINS = {}
+_MAX_TAG_CHAINS = 256
+
+
+def _tag_prefix(tags):
+    prefix = encoder._tag_prefix(tags)
+    if prefix and prefix not in _TAG_CHAINS and len(_TAG_CHAINS) < _MAX_TAG_CHAINS:
+        _TAG_CHAINS[prefix] = tags
+    return prefix
 
 
 def polymod(c, val):
@@ -198,3 +331,15 @@ def descriptor_checksum(descriptor):
     for i in range(8):
         checksum += CHECKSUM_CHARSET[(c >> (5 * (7 - i))) & 31]
     return checksum
+
+
+__all__ = [
+    "ScriptExpression",
+    "SCRIPT_EXPRESSION_TAG_MAP",
+    "CRYPTO_OUTPUT",
+    "Output",
+    "polymod",
+    "INPUT_CHARSET",
+    "CHECKSUM_CHARSET",
+    "descriptor_checksum",
+]
@@ -26,6 +26,11 @@ CRYPTO_PSBT = RegistryType("crypto-psbt", 310)
 
 
 class PSBT(Bytes):
+    __slots__ = ()
+
     @classmethod
     def registry_type(cls):
         return CRYPTO_PSBT
+
+
+__all__ = ["CRYPTO_PSBT", "PSBT"]
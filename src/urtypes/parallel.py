@@ -0,0 +1,134 @@
+# The MIT License (MIT)
+
+# Copyright (c) 2021 Tom J. Sun
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import os
+from itertools import repeat
+from urtypes.cbor import find, array_offsets, BufferEncoder, LazyItem
+from urtypes.cbor.encoder import _Array
+from urtypes.registry import decode_sequence, encode_sequence
+
+PARALLEL_THRESHOLD = 256 * 1024
+PARALLEL_ITEM_THRESHOLD = 1024
+
+
+def decode_array(
+    cbor_payload,
+    cls,
+    path=(),
+    workers=None,
+    executor=None,
+    threshold=PARALLEL_THRESHOLD,
+):
+    """Decodes the items of a large CBOR array as cls across processes.
+
+    The array at path (see urtypes.cbor.find) is scanned once for the
+    boundaries of its items, which are then split into contiguous shards and
+    decoded by a process pool, or by executor if one is given. Results are
+    returned in array order. Arrays spanning fewer than threshold bytes are
+    decoded in this process, since the pool would cost more than it saves.
+    """
+    data = memoryview(cbor_payload)
+    start, _ = find(data, path)
+    offsets = array_offsets(data, start)
+    first, last = offsets[0], offsets[-1]
+    if last - first < threshold or len(offsets) < 3:
+        return list(decode_sequence(data[first:last], cls))
+
+    workers = workers or os.cpu_count() or 1
+    shards = [data[offsets[a] : offsets[b]] for a, b in _split(offsets, workers * 4)]
+    if executor is None:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(workers) as executor:
+            return _decode_shards(executor, cls, shards)
+    return _decode_shards(executor, cls, shards)
+
+
+def encode_array(
+    items,
+    workers=None,
+    executor=None,
+    threshold=PARALLEL_ITEM_THRESHOLD,
+):
+    """Encodes a list of registry items as a CBOR array across processes.
+
+    The items are split into contiguous shards, which are pickled to a
+    process pool, or to executor if one is given, and encoded there as CBOR
+    sequences. The array header is then written in front of the shards,
+    giving the same bytes as encoding the array in this process. Lists of
+    fewer than threshold items are encoded in this process.
+    """
+    cbor_encoder = BufferEncoder()
+    cbor_encoder.encode(_array(items, workers, executor, threshold))
+    return cbor_encoder.output
+
+
+def _array(items, workers=None, executor=None, threshold=PARALLEL_ITEM_THRESHOLD):
+    # Returns the array of items as the encoder writes it, with the encoded
+    # shards in place of the items.
+    if len(items) < threshold or len(items) < 2:
+        encoded = [encode_sequence(items)]
+    else:
+        workers = workers or os.cpu_count() or 1
+        count = min(workers * 4, len(items))
+        shards = [
+            items[len(items) * k // count : len(items) * (k + 1) // count]
+            for k in range(count)
+        ]
+        if executor is None:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(workers) as executor:
+                encoded = list(executor.map(encode_sequence, shards))
+        else:
+            encoded = executor.map(encode_sequence, shards)
+    return _Array(len(items), [LazyItem(shard, 0, len(shard)) for shard in encoded])
+
+
+def _split(offsets, count):
+    # Yields (first, last) index pairs into offsets, splitting the items into
+    # at most count runs of roughly equal size in bytes.
+    first, last = offsets[0], offsets[-1]
+    a = 0
+    for k in range(1, count + 1):
+        target = first + (last - first) * k // count
+        b = a + 1
+        while b < len(offsets) - 1 and offsets[b] < target:
+            b += 1
+        if k == count:
+            b = len(offsets) - 1
+        if b > a:
+            yield a, b
+            a = b
+        if a == len(offsets) - 1:
+            return
+
+
+def _decode_shards(executor, cls, shards):
+    items = []
+    for shard in executor.map(_decode_shard, repeat(cls), map(bytes, shards)):
+        items.extend(shard)
+    return items
+
+
+def _decode_shard(cls, shard):
+    return list(decode_sequence(shard, cls))
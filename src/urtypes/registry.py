@@ -20,8 +20,8 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 
-import io
-from urtypes.cbor import decoder, encoder, DataItem
+import weakref
+from urtypes.cbor import decoder, encoder, scan, DataItem, LazyItem
 
 
 class RegistryType:
@@ -30,19 +30,330 @@ class RegistryType:
         self.tag = tag
 
 
+# Registry item classes by tag and by UR type, filled in as they are defined.
+# The types defined here are only all present once their modules have been
+# imported, as decode_any does.
+REGISTRY_TAG_MAP = {}
+REGISTRY_TYPE_MAP = {}
+
+_types_imported = False
+
+# Bumped whenever a tracked value changes. Cached hashes record the
+# generation they were computed in, as hashing an item does not register it
+# with its children.
+_generation = 0
+
+# The slots of RegistryItem that hold caches rather than attributes.
+_CACHE_SLOTS = frozenset(("_parents", "_memoized", "_cbor", "_hash"))
+
+# The subclasses made by _start_tracking, by the class they extend.
+_TRACKING_CLASSES = {}
+
+
+def _start_tracking(value):
+    # Moves value to a subclass of its class whose __setattr__ reports
+    # assignments. Only values that a cache depends on are moved, so items
+    # that never cache anything keep the plain, much faster, assignment.
+    cls = type(value)
+    if cls._tracking:
+        return
+    tracking = _TRACKING_CLASSES.get(cls)
+    if tracking is None:
+        tracking = type(
+            cls.__name__,
+            (cls,),
+            {
+                "__slots__": (),
+                "__module__": cls.__module__,
+                "__qualname__": cls.__qualname__,
+                "__setattr__": cls._assign,
+                "__reduce_ex__": _reduce_tracking,
+                "_tracking": True,
+            },
+        )
+        _TRACKING_CLASSES[cls] = tracking
+    object.__setattr__(value, "__class__", tracking)
+
+
+def _reduce_tracking(value, protocol):
+    # Copies are made as the class the value was built as, and start
+    # tracking again only once they make caches of their own.
+    return _new, (type(value).__base__,), value.__getstate__()
+
+
+def _new(cls):
+    return cls.__new__(cls)
+
+
+def _changed(value):
+    # Drops every cached hash, and the cached encodings of the items that
+    # depend on value, which registered with it when they made them.
+    global _generation
+    _generation += 1
+    parents = getattr(value, "_parents", None)
+    if parents is None:
+        return
+    value._parents = None
+    if parents.__class__ is weakref.ref:
+        parent = parents()
+        if parent is not None:
+            parent._invalidate()
+    else:
+        for parent in list(parents.values()):
+            parent._invalidate()
+
+
+def _depend(parent, value):
+    # Registers parent with value, and with the items of a list value. Items
+    # without a cache of their own register with their children in turn.
+    if isinstance(value, _ItemList):
+        for item in value:
+            if isinstance(item, (RegistryItem, Tracked)):
+                _depend(parent, item)
+    elif isinstance(value, RegistryItem):
+        if value._cbor is None:
+            value._watch()
+    elif isinstance(value, Tracked):
+        _start_tracking(value)
+    else:
+        return
+    # A single parent is held by a weak reference, and shared values keep
+    # their parents by identity, as equal items are distinct parents. Either
+    # way a child does not keep the items using it alive.
+    parents = getattr(value, "_parents", None)
+    if parents is None:
+        value._parents = weakref.ref(parent)
+    elif parents.__class__ is weakref.ref:
+        other = parents()
+        if other is not parent:
+            parents = value._parents = weakref.WeakValueDictionary()
+            if other is not None:
+                parents[id(other)] = other
+            parents[id(parent)] = parent
+    else:
+        parents[id(parent)] = parent
+
+
+class Tracked:
+    """Base of the values held by items that are not items themselves.
+
+    Once a cached encoding or hash covers such a value, such as a
+    PathComponent, assigning one of its attributes drops that cache. The
+    _parents slot is only set then, so building values costs nothing more.
+    """
+
+    __slots__ = ("_parents",)
+    _tracking = False
+
+    def _assign(self, name, value):
+        object.__setattr__(self, name, value)
+        if name != "_parents":
+            _changed(self)
+
+    def __getstate__(self):
+        # Copies are not registered with the items the original is.
+        state, slots = super().__getstate__()
+        slots.pop("_parents", None)
+        return state, slots
+
+
+class _ItemList(list):
+    # The list attributes of items that have made a cache, which tell the
+    # items whose caches depend on them when they are changed.
+    __slots__ = ("_parents",)
+
+    def __init__(self, items=()):
+        super().__init__(items)
+        self._parents = None
+
+    def __reduce__(self):
+        return _ItemList, (list(self),)
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        _changed(self)
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        _changed(self)
+
+    def __iadd__(self, other):
+        super().__iadd__(other)
+        _changed(self)
+        return self
+
+    def __imul__(self, n):
+        super().__imul__(n)
+        _changed(self)
+        return self
+
+    def append(self, value):
+        super().append(value)
+        _changed(self)
+
+    def extend(self, values):
+        super().extend(values)
+        _changed(self)
+
+    def insert(self, index, value):
+        super().insert(index, value)
+        _changed(self)
+
+    def remove(self, value):
+        super().remove(value)
+        _changed(self)
+
+    def pop(self, index=-1):
+        value = super().pop(index)
+        _changed(self)
+        return value
+
+    def clear(self):
+        super().clear()
+        _changed(self)
+
+    def sort(self, *, key=None, reverse=False):
+        super().sort(key=key, reverse=reverse)
+        _changed(self)
+
+    def reverse(self):
+        super().reverse()
+        _changed(self)
+
+
+class Deferred:
+    __slots__ = ("item", "convert")
+
+    def __init__(self, item, convert):
+        self.item = item
+        self.convert = convert
+
+
+class DeferredAttribute:
+    """Attribute that converts a Deferred value when it is first read."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        value = getattr(obj, self.name)
+        if isinstance(value, Deferred):
+            value = value.convert(value.item)
+            # The converted value was already part of any cached encoding.
+            object.__setattr__(obj, self.name, value)
+            if obj._cbor is not None or obj._parents is not None:
+                obj._watch()
+        return value
+
+    def __set__(self, obj, value):
+        setattr(obj, self.name, value)
+
+
+def defer(item, convert):
+    """Returns convert(item), postponed until first access if item is lazy."""
+    inner = item
+    while isinstance(inner, DataItem):
+        inner = inner.map
+    if isinstance(inner, LazyItem):
+        return Deferred(item, convert)
+    return convert(item)
+
+
 class RegistryItem:
+    # While memoize() is enabled, _cbor holds the cached encoding; see
+    # _encodable. _hash holds the cached hash and the generation it was
+    # computed in. An item that has made a cache
+    # starts tracking, see _start_tracking, and drops its caches when an
+    # attribute is assigned. The items that cached them register with their
+    # attributes, in _parents, to be told when those change in turn.
+    __slots__ = ("_parents", "_memoized", "_cbor", "_hash", "__weakref__")
+    _tracking = False
+
+    # The slots holding the attributes of the item, in the order _state()
+    # lists them, and the names the attributes are read by.
+    _fields = ()
+    _attributes = ()
+
+    def __init__(self):
+        self._parents = None
+        self._memoized = False
+        self._cbor = None
+        self._hash = None
+
+    def _assign(self, name, value):
+        # __setattr__ once the item is tracking.
+        if name in _CACHE_SLOTS:
+            object.__setattr__(self, name, value)
+            return
+        if value.__class__ is list:
+            value = _ItemList(value)
+        object.__setattr__(self, name, value)
+        self._invalidate()
+
+    def _invalidate(self):
+        self._cbor = None
+        self._hash = None
+        _changed(self)
+
+    def __setstate__(self, state):
+        state, slots = state
+        self._parents = None
+        for name, value in slots.items():
+            setattr(self, name, value)
+        if state:
+            self.__dict__.update(state)
+        if self._cbor is not None:
+            self._watch()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        fields = []
+        for klass in reversed(cls.__mro__):
+            slots = klass.__dict__.get("__slots__", ())
+            if isinstance(slots, str):
+                slots = (slots,)
+            for name in slots:
+                if name not in _CACHE_SLOTS and name not in ("__dict__", "__weakref__"):
+                    fields.append(name)
+        cls._fields = tuple(fields)
+        cls._attributes = tuple(
+            (
+                name[1:]
+                if isinstance(getattr(cls, name[1:], None), DeferredAttribute)
+                else name
+            )
+            for name in fields
+        )
+        try:
+            registry_type = cls.registry_type()
+        except NotImplementedError:
+            return
+        if registry_type is None:
+            return
+        # The first class to claim a type keeps it, so subclasses of the types
+        # defined here do not take their place.
+        REGISTRY_TYPE_MAP.setdefault(registry_type.type, cls)
+        if registry_type.tag is not None:
+            REGISTRY_TAG_MAP.setdefault(registry_type.tag, cls)
+
     @classmethod
     def registry_type(cls):
         raise NotImplementedError()
 
     @classmethod
     def mapping(cls, item):
+        if isinstance(item, LazyItem):
+            item = item.value()
         if isinstance(item, DataItem):
             registry_type = cls.registry_type()
             if (registry_type is None and item.tag is None) or (
                 registry_type is not None and registry_type.tag == item.tag
             ):
-                return item.map
+                item = item.map
+        if isinstance(item, LazyItem):
+            return item.value()
         return item
 
     @classmethod
@@ -53,13 +364,314 @@ class RegistryItem:
         raise NotImplementedError()
 
     @classmethod
-    def from_cbor(cls, cbor_payload):
-        cbor_decoder = decoder.Decoder(io.BytesIO(cbor_payload))
+    def from_cbor(
+        cls, cbor_payload, zero_copy=False, lazy=False, limits=None, preserve_raw=False
+    ):
+        """Decodes an item from cbor_payload.
+
+        preserve_raw implies lazy, and keeps the span of the payload each
+        item was decoded from as its memoized encoding, so an item is encoded
+        again only once it has been changed (see memoize()), and re-encoding
+        an unchanged item returns the payload as it was. The payload must
+        then not be modified while the items are in use.
+        """
+        if preserve_raw:
+            data = memoryview(cbor_payload)
+            return cls.from_data_item(
+                LazyItem(data, 0, scan.skip(data), zero_copy, limits, True)
+            )
+        cbor_decoder = decoder.BufferDecoder(
+            cbor_payload, zero_copy=zero_copy, lazy=lazy, limits=limits
+        )
         return cls.from_data_item(cbor_decoder.decode())
 
-    def to_cbor(self):
-        cbor_encoder = encoder.Encoder(io.BytesIO())
-        cbor_encoder.encode(self.to_data_item())
-        v = cbor_encoder.output.getvalue()
-        cbor_encoder.output.close()
-        return bytearray(v)
+    def memoize(self, enabled=True):
+        """Caches the encoding of this item and of its child items.
+
+        The cached encoding is reused until an attribute is assigned, a list
+        attribute is changed, or a child item or PathComponent changes in the
+        same way. Parents splice in the cached encodings of their children,
+        so only the changed items are encoded again. Buffers modified in
+        place, such as a bytearray key, are not noticed; call memoize() again
+        after changing them. Items only watch for changes once they have
+        cached an encoding, so items that are never memoized are built and
+        changed as fast as without it.
+        """
+        self._memoized = enabled
+        self._cbor = None
+        # Converts deferred attributes, so _state() holds the child items.
+        for name in self._attributes:
+            getattr(self, name)
+        for value in self._state():
+            if isinstance(value, RegistryItem) and value._memoized != enabled:
+                value.memoize(enabled)
+
+    def to_cbor(self, as_bytes=False, canonical=False, workers=None, executor=None):
+        """Encodes the item.
+
+        If workers or executor is given, the items of a large list attribute,
+        such as the output descriptors of an Account, are encoded across
+        processes as by urtypes.parallel.encode_array. Canonical encodings
+        are always made in this process.
+        """
+        if canonical or (workers is None and executor is None):
+            item = self._encodable()
+        else:
+            item = self._parallel_encodable(workers, executor)
+        if as_bytes:
+            chunks = []
+            encoder.BufferEncoder(chunks, canonical=canonical).encode(item)
+            return b"".join(chunks)
+        cbor_encoder = encoder.BufferEncoder(canonical=canonical)
+        cbor_encoder.encode(item)
+        return cbor_encoder.output
+
+    def content_digest(self):
+        """Returns the SHA-256 digest of the canonical encoding.
+
+        Items that encode the same content have the same digest, however
+        they were built and in whichever process.
+        """
+        import hashlib
+
+        return hashlib.sha256(self.to_cbor(canonical=True)).digest()
+
+    def encoded_size(self):
+        """Returns the length of to_cbor() without encoding."""
+        return encoder.encoded_size(self._encodable())
+
+    def to_cbor_into(self, buf, offset=0):
+        """Encodes into buf starting at offset and returns the end offset.
+
+        buf may be any writable buffer, such as a bytearray or a memoryview,
+        and is never resized. EncoderError is raised if it is too small, in
+        which case buf may have been partly written.
+        """
+        cbor_encoder = encoder.BufferEncoder(buf, offset)
+        cbor_encoder.encode(self._encodable())
+        return cbor_encoder.pos
+
+    def to_cbor_stream(self, sink, chunk_size=65536):
+        """Encodes to sink in chunks of at most chunk_size bytes.
+
+        sink may be a callable taking each chunk, a socket or a writable
+        file. Chunks are bytes-like, and may be memoryview slices of the
+        item's own data.
+        """
+        if callable(sink):
+            write = sink
+        elif hasattr(sink, "sendall"):
+            write = sink.sendall
+        else:
+            write = sink.write
+        cbor_encoder = encoder.StreamEncoder(write, chunk_size)
+        self._encode_stream(cbor_encoder)
+        cbor_encoder.flush()
+
+    def _encode_stream(self, cbor_encoder):
+        cbor_encoder.encode(self._encodable())
+
+    def _parallel_encodable(self, workers, executor):
+        return self._encodable()
+
+    def _encodable(self):
+        """Returns to_data_item(), or the memoized encoding as a LazyItem."""
+        if not self._memoized:
+            return self.to_data_item()
+        cbor = self._cbor
+        if cbor is None:
+            for value in self._state():
+                if isinstance(value, RegistryItem) and not value._memoized:
+                    value.memoize()
+            chunks = []
+            encoder.BufferEncoder(chunks).encode(self.to_data_item())
+            cbor = b"".join(chunks)
+            self._cbor = cbor
+            self._watch()
+        return LazyItem(cbor, 0, len(cbor))
+
+    def __hash__(self):
+        """Hashes the attributes that __eq__ compares.
+
+        The hash is cached until an attribute is assigned or a list attribute
+        or child item is changed, as with memoize(). Such a change drops every
+        cached hash, so hashing does not register items with their children.
+        Items holding buffers that can be changed in place, such
+        as a bytearray, are hashed every time.
+        """
+        cached = self._hash
+        if cached is not None and cached[1] == _generation:
+            return cached[0]
+        values = [getattr(self, name) for name in self._attributes]
+        value = hash(tuple(_hashable(item) for item in values))
+        if _cacheable(values):
+            self._hash = (value, _generation)
+            # Child items cached their own hashes and are tracked already.
+            for attribute in self._track():
+                if isinstance(attribute, _ItemList):
+                    for item in attribute:
+                        if isinstance(item, Tracked):
+                            _start_tracking(item)
+                elif isinstance(attribute, Tracked):
+                    _start_tracking(attribute)
+        return value
+
+    def _hash_differs(self, o):
+        # Called first by __eq__: items whose hashes are both cached, and
+        # still valid, cannot be equal if the hashes differ. Never hashes.
+        cached = self._hash
+        if cached is None or cached[1] != _generation:
+            return False
+        other = getattr(o, "_hash", None)
+        return other is not None and other[1] == _generation and other[0] != cached[0]
+
+    def __getstate__(self):
+        # String hashes differ between processes, so an unpickled item
+        # computes its hash again. Deferred attributes are converted, and a
+        # kept span of the payload and the memoryviews of a zero_copy decode
+        # are copied, as they refer to the buffer the item was decoded from,
+        # which cannot be pickled.
+        for name in self._attributes:
+            getattr(self, name)
+        state, slots = super().__getstate__()
+        # Copies are not registered with the items the original is.
+        del slots["_parents"]
+        slots["_hash"] = None
+        if slots["_cbor"] is not None:
+            slots["_cbor"] = bytes(slots["_cbor"])
+        for name, value in slots.items():
+            if isinstance(value, memoryview):
+                slots[name] = bytes(value)
+        if state:
+            state = {
+                name: bytes(value) if isinstance(value, memoryview) else value
+                for name, value in state.items()
+            }
+        return state, slots
+
+    def _keep_source(self, item):
+        # Called by from_data_item with the item it was given. If that was
+        # left undecoded for from_cbor(preserve_raw=True), its span is exactly
+        # the encoding of this item and is kept as the memoized encoding.
+        registry_type = self.registry_type()
+        if (
+            isinstance(item, DataItem)
+            and registry_type is not None
+            and registry_type.tag == item.tag
+        ):
+            item = item.map
+        if isinstance(item, LazyItem) and item.preserve_raw:
+            raw = item.raw()
+            # A tagged span also holds the tag, which to_data_item() leaves
+            # to the parent.
+            if not 0xC0 <= raw[0] < 0xE0:
+                self._seed(raw)
+        return self
+
+    def _seed(self, cbor):
+        self._memoized = True
+        self._cbor = cbor
+        self._watch()
+
+    def _track(self):
+        # Starts tracking this item, puts its list attributes in _ItemLists
+        # and returns the attribute values.
+        values = []
+        for name in self._fields:
+            value = getattr(self, name, None)
+            if value.__class__ is list:
+                value = _ItemList(value)
+                object.__setattr__(self, name, value)
+            values.append(value)
+        attributes = getattr(self, "__dict__", None)
+        if attributes:
+            for name, value in attributes.items():
+                if value.__class__ is list:
+                    attributes[name] = value = _ItemList(value)
+                values.append(value)
+        _start_tracking(self)
+        return values
+
+    def _watch(self):
+        # Also registers with the values the cached encoding depends on.
+        for value in self._track():
+            _depend(self, value)
+
+    def _state(self):
+        # Subclasses without __slots__ keep their own attributes in __dict__.
+        values = [getattr(self, name, None) for name in self._fields]
+        values.extend(getattr(self, "__dict__", {}).values())
+        state = []
+        for value in values:
+            state.append(value)
+            if isinstance(value, list):
+                state.extend(value)
+        return state
+
+
+def _hashable(value):
+    if isinstance(value, list):
+        return tuple(_hashable(item) for item in value)
+    if isinstance(value, (bytearray, memoryview)):
+        return bytes(value)
+    return value
+
+
+def _cacheable(values):
+    # A hash cannot be cached if it covers a buffer that can be changed in
+    # place, or a child item whose own hash is not cached for that reason.
+    for value in values:
+        if isinstance(value, list):
+            if not _cacheable(value):
+                return False
+        elif isinstance(value, bytearray):
+            return False
+        elif isinstance(value, memoryview) and not value.readonly:
+            return False
+        elif isinstance(value, RegistryItem) and value._hash is None:
+            return False
+    return True
+
+
+def decode_any(cbor_payload, ur_type=None, zero_copy=False, lazy=False, limits=None):
+    """Decodes cbor_payload as the registry type named ur_type.
+
+    Without ur_type, the payload must be tagged, and is decoded as the class
+    registered for its top-level tag in REGISTRY_TAG_MAP.
+    """
+    global _types_imported
+    if not _types_imported:
+        import urtypes.bytes
+        import urtypes.crypto
+
+        urtypes.crypto._import_all()
+        _types_imported = True
+    if ur_type is not None:
+        if ur_type not in REGISTRY_TYPE_MAP:
+            raise ValueError("Unknown registry type {}".format(ur_type))
+        return REGISTRY_TYPE_MAP[ur_type].from_cbor(
+            cbor_payload, zero_copy=zero_copy, lazy=lazy, limits=limits
+        )
+    item = decoder.BufferDecoder(
+        cbor_payload, zero_copy=zero_copy, lazy=lazy, limits=limits
+    ).decode()
+    if not isinstance(item, DataItem) or item.tag not in REGISTRY_TAG_MAP:
+        raise ValueError("Payload has no registered tag")
+    return REGISTRY_TAG_MAP[item.tag].from_data_item(item)
+
+
+def decode_sequence(cbor_payload, cls, zero_copy=False, lazy=False, limits=None):
+    """Yields each item of a CBOR sequence (RFC 8742) decoded as cls."""
+    cbor_decoder = decoder.BufferDecoder(
+        cbor_payload, zero_copy=zero_copy, lazy=lazy, limits=limits
+    )
+    while cbor_decoder.pos < len(cbor_decoder.data):
+        yield cls.from_data_item(cbor_decoder.decode())
+
+
+def encode_sequence(items):
+    """Encodes items back to back as a CBOR sequence (RFC 8742)."""
+    cbor_encoder = encoder.BufferEncoder()
+    for item in items:
+        cbor_encoder.encode(item._encodable())
+    return cbor_encoder.output
@@ -0,0 +1,212 @@
+# The MIT License (MIT)
+
+# Copyright (c) 2021 Tom J. Sun
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import binascii
+import io
+from unittest import TestCase
+from urtypes.cbor import (
+    Decoder,
+    BufferDecoder,
+    IncrementalDecoder,
+    LazyItem,
+    Limits,
+    DataItem,
+    InvalidCborError,
+)
+
+
+class BufferDecoderTestCase(TestCase):
+    def table(self):
+        return [
+            {"test": "Small unsigned integer", "cbor": "17", "value": 23},
+            {"test": "uint16", "cbor": "190100", "value": 256},
+            {"test": "Negative integer", "cbor": "3863", "value": -100},
+            {"test": "Bytestring", "cbor": "4401020304", "value": b"\x01\x02\x03\x04"},
+            {
+                "test": "Indefinite bytestring",
+                "cbor": "5f42010243030405ff",
+                "value": b"\x01\x02\x03\x04\x05",
+            },
+            {"test": "Textstring", "cbor": "6449455446", "value": "IETF"},
+            {
+                "test": "Indefinite textstring",
+                "cbor": "7f657374726561646d696e67ff",
+                "value": "streaming",
+            },
+            {
+                "test": "Indefinite list and map",
+                "cbor": "9f01bf0102039fffff80a0ff",
+                "value": [1, {1: 2, 3: []}, [], {}],
+            },
+            {"test": "Simple values", "cbor": "83f4f5f6", "value": [False, True, None]},
+            {"test": "Half float", "cbor": "f93c00", "value": 1.0},
+            {
+                "test": "Nested map",
+                "cbor": "a201020382f5a10104",
+                "value": {1: 2, 3: [True, {1: 4}]},
+            },
+        ]
+
+    def test_decode(self):
+        for row in self.table():
+            cbor = binascii.unhexlify(row["cbor"])
+            for data in (cbor, bytearray(cbor), memoryview(cbor)):
+                self.assertEqual(BufferDecoder(data).decode(), row["value"])
+            self.assertEqual(Decoder(io.BytesIO(cbor)).decode(), row["value"])
+
+    def test_decode_tagged(self):
+        cbor = binascii.unhexlify("d90130a1018a182cf501f501f500f401f4")
+        item = BufferDecoder(cbor).decode()
+        self.assertIsInstance(item, DataItem)
+        self.assertEqual(item.tag, 304)
+        self.assertEqual(
+            item.map, {1: [44, True, 1, True, 1, True, 0, False, 1, False]}
+        )
+
+    def test_decode_sequence(self):
+        decoder = BufferDecoder(binascii.unhexlify("0102420304"))
+        self.assertEqual(decoder.decode(), 1)
+        self.assertEqual(decoder.decode(), 2)
+        self.assertEqual(decoder.decode(), b"\x03\x04")
+        self.assertEqual(decoder.pos, 5)
+
+    def test_zero_copy(self):
+        cbor = bytearray(binascii.unhexlify("a1034401020304"))
+        value = BufferDecoder(cbor, zero_copy=True).decode()[3]
+        self.assertIsInstance(value, memoryview)
+        self.assertEqual(value, b"\x01\x02\x03\x04")
+        cbor[3] = 0xFF
+        self.assertEqual(value[0], 0xFF)
+
+        value = BufferDecoder(cbor).decode()[3]
+        self.assertIsInstance(value, bytes)
+
+    def test_truncated(self):
+        for cbor in ("", "19", "1901", "440102", "82", "a101", "81820119", "81814201"):
+            for lazy in (False, True):
+                with self.assertRaises(InvalidCborError):
+                    BufferDecoder(binascii.unhexlify(cbor), lazy=lazy).decode()
+
+    def test_deep_nesting(self):
+        depth = 5000
+        cbor = b"\x81" * depth + b"\x01"
+        value = BufferDecoder(cbor, limits=Limits(max_depth=depth)).decode()
+        for _ in range(depth):
+            value = value[0]
+        self.assertEqual(value, 1)
+
+        cbor = b"\xd9\x01\x90" * depth + b"\xa0"
+        value = BufferDecoder(cbor, limits=Limits(max_depth=depth)).decode()
+        for _ in range(depth):
+            self.assertEqual(value.tag, 400)
+            value = value.map
+        self.assertEqual(value, {})
+
+    def test_max_depth(self):
+        BufferDecoder(b"\x81\x81\x81\x01", limits=Limits(max_depth=3)).decode()
+        for cbor in (b"\x81\x81\x81\x81\x01", b"\x9f\x81\xa1\x01\xc1\x01"):
+            with self.assertRaises(InvalidCborError):
+                BufferDecoder(cbor, limits=Limits(max_depth=3)).decode()
+        with self.assertRaises(InvalidCborError):
+            BufferDecoder(b"\x81" * 100000).decode()
+
+    def test_invalid(self):
+        for cbor in (
+            "1c",
+            "3d",
+            "5e",
+            "7c",
+            "9c",
+            "bd",
+            "df00",
+            "f8",
+            "ff",
+            "8201ff",
+            "bf01ff",
+            "5f01ff",
+            "5f5f4101ffff",
+            "7f4101ff",
+        ):
+            with self.assertRaises(InvalidCborError):
+                BufferDecoder(binascii.unhexlify(cbor)).decode()
+
+    def test_decode_lazy(self):
+        for row in self.table():
+            cbor = binascii.unhexlify(row["cbor"])
+            self.assertEqual(BufferDecoder(cbor, lazy=True).decode(), row["value"])
+
+        cbor = binascii.unhexlify("a301820203029f04ff03d90130a1018200f4")
+        value = BufferDecoder(cbor, lazy=True).decode()
+        self.assertIsInstance(value[1], LazyItem)
+        self.assertEqual(bytes(value[1].raw()), binascii.unhexlify("820203"))
+        self.assertIsInstance(value[2], LazyItem)
+        self.assertEqual(len(value[2]), 1)
+        self.assertIsInstance(value[3].map, LazyItem)
+        self.assertEqual(value[3].tag, 304)
+        self.assertTrue(1 in value[3].map)
+        self.assertEqual(list(value[3].map[1]), [0, False])
+
+
+class IncrementalDecoderTestCase(TestCase):
+    def test_feed_bytewise(self):
+        for row in BufferDecoderTestCase.table(self):
+            cbor = binascii.unhexlify(row["cbor"])
+            decoder = IncrementalDecoder()
+            items = []
+            for i in range(len(cbor)):
+                self.assertEqual(items, [])
+                items += decoder.feed(cbor[i : i + 1])
+            self.assertEqual(items, [row["value"]])
+            self.assertFalse(decoder.pending())
+            decoder.close()
+
+    def test_feed_sequence(self):
+        received = []
+        decoder = IncrementalDecoder(received.append)
+        self.assertEqual(decoder.feed(binascii.unhexlify("01a1")), [1])
+        self.assertEqual(decoder.feed(binascii.unhexlify("0102")), [{1: 2}])
+        self.assertEqual(decoder.feed(binascii.unhexlify("830405")), [])
+        self.assertTrue(decoder.pending())
+        self.assertEqual(decoder.feed(binascii.unhexlify("0607")), [[4, 5, 6], 7])
+        self.assertEqual(received, [1, {1: 2}, [4, 5, 6], 7])
+
+    def test_feed_large_bytestring(self):
+        payload = bytes(range(256)) * 4096
+        cbor = b"\xa1\x01\x5a" + len(payload).to_bytes(4, "big") + payload
+        decoder = IncrementalDecoder()
+        items = []
+        for i in range(0, len(cbor), 1000):
+            items += decoder.feed(memoryview(cbor)[i : i + 1000])
+        self.assertEqual(items, [{1: payload}])
+
+    def test_feed_reused_buffer(self):
+        buffer = bytearray(b"\x42\x01")
+        decoder = IncrementalDecoder()
+        self.assertEqual(decoder.feed(buffer), [])
+        buffer[:] = b"\x02\xff"
+        self.assertEqual(decoder.feed(buffer[:1]), [b"\x01\x02"])
+
+    def test_close_incomplete(self):
+        decoder = IncrementalDecoder()
+        decoder.feed(binascii.unhexlify("8201"))
+        with self.assertRaises(InvalidCborError):
+            decoder.close()
@@ -0,0 +1,186 @@
+# The MIT License (MIT)
+
+# Copyright (c) 2021 Tom J. Sun
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import binascii
+import io
+from collections import OrderedDict
+from unittest import TestCase
+from urtypes.cbor import (
+    Encoder,
+    BufferEncoder,
+    StreamEncoder,
+    EncoderError,
+    encoded_size,
+    DataItem,
+    Mapping,
+    Tagging,
+)
+from urtypes.cbor.data import Undefined
+
+
+class EncoderTestCase(TestCase):
+    def table(self):
+        return [
+            {"test": "Small unsigned integer", "value": 23, "cbor": "17"},
+            {"test": "uint8", "value": 24, "cbor": "1818"},
+            {"test": "uint8 maximum", "value": 255, "cbor": "18ff"},
+            {"test": "uint16", "value": 256, "cbor": "190100"},
+            {"test": "uint32", "value": 65536, "cbor": "1a00010000"},
+            {"test": "uint64", "value": 4294967296, "cbor": "1b0000000100000000"},
+            {
+                "test": "uint64 maximum",
+                "value": 18446744073709551615,
+                "cbor": "1bffffffffffffffff",
+            },
+            {"test": "Negative integer", "value": -100, "cbor": "3863"},
+            {"test": "Negative uint16", "value": -1000, "cbor": "3903e7"},
+            {"test": "Bytestring", "value": b"\x01\x02", "cbor": "420102"},
+            {
+                "test": "Long bytestring",
+                "value": bytes(300),
+                "cbor": "59012c" + "00" * 300,
+            },
+            {"test": "Textstring", "value": "IETF", "cbor": "6449455446"},
+            {"test": "Float", "value": 1.1, "cbor": "fb3ff199999999999a"},
+            {
+                "test": "Simple values",
+                "value": [False, True, None, Undefined],
+                "cbor": "84f4f5f6f7",
+            },
+            {
+                "test": "Nested containers",
+                "value": {1: [2, {3: 4}], 5: []},
+                "cbor": "a2018202a1030405" + "80",
+            },
+            {
+                "test": "Tagged map",
+                "value": DataItem(304, {1: [44, True]}),
+                "cbor": "d90130a10182182cf5",
+            },
+            {
+                "test": "Tag chain",
+                "value": DataItem(400, DataItem(1, {1: 2})),
+                "cbor": "d90190c1a10102",
+            },
+        ]
+
+    def test_encode(self):
+        for row in self.table():
+            cbor = binascii.unhexlify(row["cbor"])
+            encoder = BufferEncoder()
+            encoder.encode(row["value"])
+            self.assertEqual(encoder.output, cbor, msg=row["test"])
+
+            encoder = Encoder(io.BytesIO())
+            encoder.encode(row["value"])
+            self.assertEqual(encoder.output.getvalue(), cbor, msg=row["test"])
+
+            self.assertEqual(encoded_size(row["value"]), len(cbor), msg=row["test"])
+
+    def test_encode_stream(self):
+        for chunk_size in (1, 3, 64):
+            for row in self.table():
+                chunks = []
+                encoder = StreamEncoder(chunks.append, chunk_size)
+                encoder.encode(row["value"])
+                encoder.flush()
+                self.assertEqual(
+                    b"".join(chunks), binascii.unhexlify(row["cbor"]), msg=row["test"]
+                )
+                for chunk in chunks:
+                    self.assertLessEqual(len(chunk), chunk_size)
+
+    def test_canonical(self):
+        for value, cbor in (
+            ({10: 1, 1: 2, -1: 3, "a": 4, b"a": 5}, "a501020a012003416105616104"),
+            (1.5, "f93e00"),
+            (100000.0, "fa47c35000"),
+            (1.1, "fb3ff199999999999a"),
+            (float("inf"), "f97c00"),
+            (float("nan"), "f97e00"),
+            (-0.0, "f98000"),
+            (
+                DataItem(304, {3: [{2: 0, 1: 1}], 1: 2.0}),
+                "d90130a201f9400003" + "81a201010200",
+            ),
+        ):
+            cbor = binascii.unhexlify(cbor)
+            encoder = BufferEncoder(canonical=True)
+            encoder.encode(value)
+            self.assertEqual(encoder.output, cbor)
+            encoder = Encoder(io.BytesIO(), canonical=True)
+            encoder.encode(value)
+            self.assertEqual(encoder.output.getvalue(), cbor)
+
+    def test_encode_into_existing(self):
+        output = bytearray(b"\xff")
+        encoder = BufferEncoder(output)
+        encoder.encode(1)
+        encoder.encode([2])
+        self.assertIs(encoder.output, output)
+        self.assertEqual(output, b"\xff\x01\x81\x02")
+
+    def test_tag_chain(self):
+        value = []
+        for _ in range(10000):
+            value = DataItem(1, value)
+        encoder = BufferEncoder()
+        encoder.encode(DataItem(400, value))
+        self.assertEqual(encoder.output, b"\xd9\x01\x90" + b"\xc1" * 10000 + b"\x80")
+
+        with self.assertRaises(EncoderError):
+            BufferEncoder().encode(DataItem(400, DataItem(1 << 64, [])))
+
+    def test_deep_nesting(self):
+        value = 1
+        for _ in range(10000):
+            value = DataItem(400, [value])
+        encoder = BufferEncoder()
+        encoder.encode(value)
+        self.assertEqual(encoder.output, b"\xd9\x01\x90\x81" * 10000 + b"\x01")
+
+    def test_subclasses(self):
+        class Index(int):
+            pass
+
+        class Map(OrderedDict):
+            pass
+
+        for value, cbor in (
+            (Index(300), "19012c"),
+            (Map([(2, b"")]), "a10240"),
+            (bytearray(b"\x01"), "4101"),
+            (memoryview(b"\x01\x02"), "420102"),
+            (Mapping({1: 2}), "a10102"),
+            (Tagging(1, 0), "c100"),
+        ):
+            encoder = BufferEncoder()
+            encoder.encode(value)
+            self.assertEqual(encoder.output, binascii.unhexlify(cbor))
+            self.assertEqual(encoded_size(value), len(cbor) // 2)
+
+    def test_unsupported(self):
+        for value in (18446744073709551616, -18446744073709551617, object()):
+            with self.assertRaises(EncoderError):
+                BufferEncoder().encode(value)
+            with self.assertRaises(EncoderError):
+                encoded_size(value)
@@ -0,0 +1,174 @@
+# The MIT License (MIT)
+
+# Copyright (c) 2021 Tom J. Sun
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import binascii
+from unittest import TestCase
+from urtypes.cbor import (
+    iter_events,
+    skip,
+    BufferDecoder,
+    InvalidCborError,
+    INT,
+    BYTES,
+    TEXT,
+    START_ARRAY,
+    START_MAP,
+    TAG,
+    SIMPLE,
+    FLOAT,
+    END,
+)
+from urtypes.cbor.data import Undefined
+from urtypes.crypto import (
+    Account,
+    Output,
+    HDKey,
+    ECKey,
+    CRYPTO_HDKEY,
+    SCRIPT_EXPRESSION_TAG_MAP,
+)
+
+
+def events(cbor):
+    return [
+        (event, bytes(value) if isinstance(value, memoryview) else value, offset)
+        for event, value, offset in iter_events(binascii.unhexlify(cbor))
+    ]
+
+
+class EventsTestCase(TestCase):
+    def table(self):
+        return [
+            {
+                "test": "Tagged map",
+                "cbor": "d90130a2018202f5034101",
+                "events": [
+                    (TAG, 304, 0),
+                    (START_MAP, 2, 3),
+                    (INT, 1, 4),
+                    (START_ARRAY, 2, 5),
+                    (INT, 2, 6),
+                    (SIMPLE, True, 7),
+                    (END, None, 8),
+                    (INT, 3, 8),
+                    (BYTES, b"\x01", 9),
+                    (END, None, 11),
+                ],
+            },
+            {
+                "test": "Sequence of scalars",
+                "cbor": "3863f7f93c006161",
+                "events": [
+                    (INT, -100, 0),
+                    (SIMPLE, Undefined, 2),
+                    (FLOAT, 1.0, 3),
+                    (TEXT, b"a", 6),
+                ],
+            },
+            {
+                "test": "Empty and indefinite containers",
+                "cbor": "9f80a0ff5f4101ff",
+                "events": [
+                    (START_ARRAY, None, 0),
+                    (START_ARRAY, 0, 1),
+                    (END, None, 2),
+                    (START_MAP, 0, 2),
+                    (END, None, 3),
+                    (END, None, 4),
+                    (BYTES, None, 4),
+                    (BYTES, b"\x01", 5),
+                    (END, None, 8),
+                ],
+            },
+        ]
+
+    def test_events(self):
+        for row in self.table():
+            self.assertEqual(events(row["cbor"]), row["events"], msg=row["test"])
+
+    def test_balanced(self):
+        for row in self.table():
+            depth = 0
+            for event, value, offset in iter_events(binascii.unhexlify(row["cbor"])):
+                if event in (START_ARRAY, START_MAP) or (
+                    event in (BYTES, TEXT) and value is None
+                ):
+                    depth += 1
+                elif event == END:
+                    depth -= 1
+                self.assertGreaterEqual(depth, 0)
+            self.assertEqual(depth, 0)
+
+    def test_scanners(self):
+        hd_key = HDKey({"key": bytes(33), "chain_code": bytes(32)})
+        ec_key = ECKey(bytes(33), None, None)
+        item = Account(
+            bytes(4),
+            [
+                Output([SCRIPT_EXPRESSION_TAG_MAP[404]], hd_key),
+                Output([SCRIPT_EXPRESSION_TAG_MAP[403]], ec_key),
+                Output(
+                    [SCRIPT_EXPRESSION_TAG_MAP[400], SCRIPT_EXPRESSION_TAG_MAP[404]],
+                    hd_key,
+                ),
+            ],
+        )
+        cbor = item.to_cbor()
+
+        stream = iter_events(cbor)
+        for event, value, offset in stream:
+            if event == INT and value == 2:
+                break
+        event, count, offset = next(stream)
+        self.assertEqual(event, START_ARRAY)
+        self.assertEqual(count, len(item.output_descriptors))
+
+        offsets = [
+            offset
+            for event, value, offset in iter_events(cbor)
+            if event == TAG and value == CRYPTO_HDKEY.tag
+        ]
+        self.assertEqual(len(offsets), 2)
+        for offset in offsets:
+            self.assertEqual(cbor[offset : offset + 3], b"\xd9\x01\x2f")
+
+    def test_invalid(self):
+        for cbor in ("82", "8201ff", "ff", "5f01ff", "7f4101ff", "1c", "f8", "43"):
+            with self.assertRaises(InvalidCborError):
+                list(iter_events(binascii.unhexlify(cbor)))
+        with self.assertRaises(InvalidCborError):
+            list(iter_events(b"\x81" * 100, max_depth=10))
+
+    def test_truncated_tag(self):
+        # A tag must be followed by its item, at the top level as well, as
+        # skip() and BufferDecoder require.
+        for cbor in ("d9012f", "c1", "c1c1", "81c1"):
+            data = binascii.unhexlify(cbor)
+            for walk in (
+                lambda: list(iter_events(data)),
+                lambda: skip(data),
+                lambda: BufferDecoder(data).decode(),
+            ):
+                with self.assertRaises(InvalidCborError):
+                    walk()
+        with self.assertRaises(InvalidCborError):
+            list(iter_events(binascii.unhexlify("01c1")))
@@ -0,0 +1,146 @@
+# The MIT License (MIT)
+
+# Copyright (c) 2021 Tom J. Sun
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import binascii
+import io
+import time
+import tracemalloc
+from unittest import TestCase
+from urtypes.cbor import (
+    Decoder,
+    BufferDecoder,
+    IncrementalDecoder,
+    InvalidCborError,
+    Limits,
+    extract,
+    find,
+    iter_events,
+    skip,
+)
+from urtypes.cbor.decoder import MAX_DEPTH
+from urtypes.crypto import PSBT
+
+
+class LimitsTestCase(TestCase):
+    def assertBounded(self, decode, max_memory=64 * 1024, max_seconds=1.0):
+        tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            with self.assertRaises(InvalidCborError):
+                decode()
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertLess(peak, max_memory)
+        self.assertLess(elapsed, max_seconds)
+
+    def test_declared_lengths(self):
+        for cbor in (
+            "9bffffffffffffffff01",
+            "bbffffffffffffffff0102",
+            "5bffffffffffffffff00",
+            "7bffffffffffffffff00",
+            "9a0001000000" + "00" * 1000,
+            "a20102",
+        ):
+            data = binascii.unhexlify(cbor)
+            self.assertBounded(lambda: BufferDecoder(data).decode())
+            self.assertBounded(lambda: BufferDecoder(data, lazy=True).decode())
+            self.assertBounded(lambda: Decoder(io.BytesIO(data)).decode())
+
+    def test_deep_nesting(self):
+        data = b"\x81" * 1000000
+        self.assertBounded(lambda: BufferDecoder(data).decode(), max_memory=512 * 1024)
+        data = b"\x9f" * 1000000
+        self.assertBounded(lambda: BufferDecoder(data).decode(), max_memory=512 * 1024)
+
+    def test_unbounded_depth(self):
+        # A max_depth of None is not checked, like the other bounds.
+        depth = 2 * MAX_DEPTH
+        data = b"\x81" * depth + b"\x01"
+        limits = Limits(max_depth=None)
+        value = BufferDecoder(data, limits=limits).decode()
+        for _ in range(depth):
+            value = value[0]
+        self.assertEqual(value, 1)
+        self.assertEqual(skip(data, max_depth=None), len(data))
+        self.assertEqual(find(data, [0], max_depth=None), (1, len(data)))
+        self.assertEqual(extract(data, [0] * depth, limits=limits), 1)
+        self.assertEqual(len(list(iter_events(data, max_depth=None))), 2 * depth + 1)
+
+    def test_max_items(self):
+        limits = Limits(max_items=100)
+        BufferDecoder(b"\x98\x64" + b"\x00" * 100, limits=limits).decode()
+        for data in (
+            b"\x98\x65" + b"\x00" * 101,
+            b"\x82\x98\x32" + b"\x00" * 50 + b"\x98\x32" + b"\x00" * 50,
+            b"\x9f" + b"\x00" * 1000 + b"\xff",
+            b"\xbf" + b"\x00\x00" * 1000 + b"\xff",
+        ):
+            self.assertBounded(lambda: BufferDecoder(data, limits=limits).decode())
+
+    def test_max_bytes(self):
+        limits = Limits(max_bytes=64)
+        BufferDecoder(b"\x58\x40" + bytes(64), limits=limits).decode()
+        for data in (
+            b"\x58\x41" + bytes(65),
+            b"\x78\x41" + b"a" * 65,
+            b"\x5f\x58\x41" + bytes(65) + b"\xff",
+        ):
+            self.assertBounded(lambda: BufferDecoder(data, limits=limits).decode())
+
+        decoder = IncrementalDecoder(limits=limits)
+        self.assertBounded(
+            lambda: decoder.feed(b"\x5b\xff\xff\xff\xff\xff\xff\xff\xff")
+        )
+
+    def test_max_allocation(self):
+        limits = Limits(max_allocation=1024)
+        BufferDecoder(b"\x59\x03\xf0" + bytes(1008), limits=limits).decode()
+        for data in (
+            b"\x59\x04\x01" + bytes(1025),
+            b"\x5f" + (b"\x58\x80" + bytes(128)) * 9 + b"\xff",
+            b"\x98\x81" + b"\x00" * 129,
+            b"\xb8\x41" + b"\x00\x00" * 65,
+        ):
+            self.assertBounded(lambda: BufferDecoder(data, limits=limits).decode())
+
+    def test_max_allocation_incremental(self):
+        # Strings cut off at a chunk boundary are charged once, not each time
+        # decoding resumes.
+        limits = Limits(max_allocation=1500)
+        for data in (
+            b"\x59\x03\xe8" + bytes(1000),
+            b"\x5f" + (b"\x58\x64" + bytes(100)) * 10 + b"\xff",
+        ):
+            decoder = IncrementalDecoder(limits=limits)
+            items = []
+            for i in range(0, len(data), 10):
+                items.extend(decoder.feed(data[i : i + 10]))
+            self.assertEqual(items, [bytes(1000)])
+
+    def test_from_cbor(self):
+        cbor = b"\x59\x04\x00" + bytes(1024)
+        self.assertEqual(PSBT.from_cbor(cbor).data, bytes(1024))
+        with self.assertRaises(InvalidCborError):
+            PSBT.from_cbor(cbor, limits=Limits(max_bytes=1023))
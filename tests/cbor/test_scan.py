@@ -0,0 +1,103 @@
+# The MIT License (MIT)
+
+# Copyright (c) 2021 Tom J. Sun
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import binascii
+from unittest import TestCase
+from urtypes.cbor import (
+    skip,
+    find,
+    extract,
+    array_offsets,
+    InvalidCborError,
+    DataItem,
+)
+
+HDKEY = binascii.unhexlify(
+    "a5035821026fe2355745bb2db3630bbc80ef5d58951c963c841f54170ba6e5c12be7fc12a6045820ced155c72456255881793514edc5bd9447e7f74abb88c6d6b6480fd016ee8c8505d90131a1020106d90130a1018a182cf501f501f500f401f4081ae9181cf3"
+)
+
+
+class ScanTestCase(TestCase):
+    def test_skip(self):
+        for cbor in (
+            "01",
+            "1a00010000",
+            "4401020304",
+            "5f42010243030405ff",
+            "a201020382f5a10104",
+            "9f01bf0102039fffff80a0ff",
+            "d90130a1018a182cf501f501f500f401f4",
+            "fb3ff199999999999a",
+        ):
+            data = binascii.unhexlify(cbor)
+            self.assertEqual(skip(data + b"\x00"), len(data))
+            self.assertEqual(skip(b"\x00" + data, 1), len(data) + 1)
+
+    def test_skip_invalid(self):
+        for cbor in ("", "82", "440102", "1b0001", "ff", "9f01", "1c"):
+            with self.assertRaises(InvalidCborError):
+                skip(binascii.unhexlify(cbor))
+
+    def test_extract(self):
+        self.assertEqual(extract(HDKEY, [8]), 0xE9181CF3)
+        self.assertEqual(extract(HDKEY, [5, 2]), 1)
+        self.assertEqual(extract(HDKEY, [6, 1, 0]), 44)
+        self.assertEqual(extract(HDKEY, [6, 1, 9]), False)
+        origin = extract(HDKEY, [6])
+        self.assertIsInstance(origin, DataItem)
+        self.assertEqual(origin.tag, 304)
+
+        start, end = find(HDKEY, [3])
+        self.assertEqual((start, end), (2, 37))
+
+        cbor = binascii.unhexlify("9f01bf6161a1f5f4ff02ff")
+        self.assertEqual(extract(cbor, [1, "a", True]), False)
+        self.assertEqual(extract(cbor, [2]), 2)
+
+        value = extract(HDKEY, [4], zero_copy=True)
+        self.assertIsInstance(value, memoryview)
+        self.assertEqual(value.obj, HDKEY)
+
+    def test_extract_missing(self):
+        with self.assertRaises(KeyError):
+            extract(HDKEY, [1])
+        with self.assertRaises(KeyError):
+            extract(HDKEY, [8, 0])
+        with self.assertRaises(IndexError):
+            extract(HDKEY, [6, 1, 10])
+        with self.assertRaises(IndexError):
+            extract(binascii.unhexlify("9f0102ff"), [2])
+        with self.assertRaises(InvalidCborError):
+            extract(binascii.unhexlify("a20102"), [3])
+
+    def test_array_offsets(self):
+        self.assertEqual(
+            array_offsets(HDKEY, 85), [86, 88, 89, 90, 91, 92, 93, 94, 95, 96, 97]
+        )
+        self.assertEqual(array_offsets(binascii.unhexlify("80")), [1])
+        self.assertEqual(
+            array_offsets(binascii.unhexlify("d9012f9f01820203ff")), [4, 5, 8]
+        )
+        with self.assertRaises(InvalidCborError):
+            array_offsets(HDKEY)
+        with self.assertRaises(InvalidCborError):
+            array_offsets(binascii.unhexlify("8301"))
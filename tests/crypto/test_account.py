@@ -22,6 +22,7 @@
 
 import binascii
 from unittest import TestCase
+from urtypes import Deferred
 from urtypes.crypto import (
     Account,
     Output,
@@ -204,6 +205,23 @@ class AccountTestCase(TestCase):
         for row in self.table():
             self.assertEqual(Account.from_cbor(row["cbor"]), row["item"])
 
+    def test_from_cbor_lazy(self):
+        for row in self.table():
+            account = Account.from_cbor(row["cbor"], lazy=True)
+            self.assertIsInstance(account._output_descriptors, Deferred)
+            self.assertEqual(account.master_fingerprint, row["item"].master_fingerprint)
+            output = account.output_descriptors[0]
+            self.assertIsInstance(output.crypto_key._origin, Deferred)
+            self.assertEqual(
+                output.script_expressions,
+                row["item"].output_descriptors[0].script_expressions,
+            )
+            self.assertEqual(account, row["item"])
+
     def test_to_cbor(self):
         for row in self.table():
             self.assertEqual(row["item"].to_cbor(), row["cbor"])
+
+    def test_encoded_size(self):
+        for row in self.table():
+            self.assertEqual(row["item"].encoded_size(), len(row["cbor"]))
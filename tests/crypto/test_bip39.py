@@ -57,6 +57,14 @@ class BIP39TestCase(TestCase):
         for row in self.table():
             self.assertEqual(BIP39.from_cbor(row["cbor"]), row["item"])
 
+    def test_from_cbor_lazy(self):
+        for row in self.table():
+            bip39 = BIP39.from_cbor(row["cbor"], lazy=True)
+            self.assertIsInstance(bip39.words, list)
+            self.assertEqual(bip39, row["item"])
+            bip39.words.append("zoo")
+            self.assertEqual(bip39.words[-1], "zoo")
+
     def test_to_cbor(self):
         for row in self.table():
             self.assertEqual(row["item"].to_cbor(), row["cbor"])
@@ -83,3 +83,7 @@ class HDKeyTestCase(TestCase):
     def test_to_cbor(self):
         for row in self.table():
             self.assertEqual(row["item"].to_cbor(), row["cbor"])
+
+    def test_encoded_size(self):
+        for row in self.table():
+            self.assertEqual(row["item"].encoded_size(), len(row["cbor"]))
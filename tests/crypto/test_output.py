@@ -21,8 +21,10 @@
 # THE SOFTWARE.
 
 import binascii
-from unittest import TestCase
+import copy
+from unittest import TestCase, mock
 from urtypes.crypto import (
+    Account,
     Keypath,
     PathComponent,
     MultiKey,
@@ -216,6 +218,49 @@ class OutputTestCase(TestCase):
                 row["item"].to_cbor(), row["cbor"], msg="\nFailed: %s" % row["test"]
             )
 
+    def test_encoded_size(self):
+        for row in self.table():
+            self.assertEqual(
+                row["item"].encoded_size(),
+                len(row["cbor"]),
+                msg="\nFailed: %s" % row["test"],
+            )
+
+    def test_from_cbor_lazy(self):
+        for row in self.table():
+            self.assertEqual(
+                Output.from_cbor(row["cbor"], lazy=True),
+                row["item"],
+                msg="\nFailed: %s" % row["test"],
+            )
+
+    def test_tag_chain(self):
+        for row in self.table():
+            item = row["item"].to_data_item()
+            self.assertEqual(Output.from_data_item(item), row["item"], msg=row["test"])
+            copied = copy.deepcopy(item)
+            self.assertEqual(copied, item, msg=row["test"])
+            copied.tag = 999
+            self.assertNotEqual(copied, item, msg=row["test"])
+            # The first decode of a chain of tags goes through DataItems, and
+            # later ones match its prefix, nested or not.
+            self.assertEqual(
+                Output.from_cbor(row["cbor"]), row["item"], msg=row["test"]
+            )
+            account = Account(b"\x01\x02\x03\x04", [row["item"]] * 3)
+            with mock.patch.object(
+                Output, "from_data_item", side_effect=AssertionError
+            ):
+                self.assertEqual(
+                    Output.from_cbor(row["cbor"]), row["item"], msg=row["test"]
+                )
+                decoded = Account.from_cbor(account.to_cbor(), lazy=True)
+                self.assertEqual(
+                    decoded.output_descriptors,
+                    account.output_descriptors,
+                    msg=row["test"],
+                )
+
     def test_descriptor(self):
         for row in self.table():
             self.assertEqual(
@@ -45,6 +45,19 @@ class PSBTTestCase(TestCase):
         for row in self.table():
             self.assertEqual(PSBT.from_cbor(row["cbor"]), row["item"])
 
+    def test_from_cbor_buffer(self):
+        for row in self.table():
+            for cbor in (bytearray(row["cbor"]), memoryview(row["cbor"])):
+                self.assertEqual(PSBT.from_cbor(cbor), row["item"])
+            psbt = PSBT.from_cbor(row["cbor"], zero_copy=True)
+            self.assertIsInstance(psbt.data, memoryview)
+            self.assertIs(psbt.data.obj, row["cbor"])
+            self.assertEqual(psbt, row["item"])
+
     def test_to_cbor(self):
         for row in self.table():
             self.assertEqual(row["item"].to_cbor(), row["cbor"])
+
+    def test_encoded_size(self):
+        for row in self.table():
+            self.assertEqual(row["item"].encoded_size(), len(row["cbor"]))
@@ -0,0 +1,67 @@
+# The MIT License (MIT)
+
+# Copyright (c) 2021 Tom J. Sun
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""Synthetic items shared by the tests and the benchmarks."""
+
+from urtypes.crypto import (
+    Account,
+    ECKey,
+    HDKey,
+    Keypath,
+    Output,
+    PathComponent,
+    SCRIPT_EXPRESSION_TAG_MAP,
+)
+
+
+def output(index):
+    """Returns a wpkh output of the key at 84'/index'."""
+    return Output(
+        [SCRIPT_EXPRESSION_TAG_MAP[404]],
+        HDKey(
+            {
+                "key": bytes(33),
+                "chain_code": bytes(32),
+                "origin": Keypath(
+                    [PathComponent(84, True), PathComponent(index, True)],
+                    bytes(4),
+                    None,
+                ),
+            }
+        ),
+    )
+
+
+def outputs(count):
+    return [output(i) for i in range(count)]
+
+
+def account(count):
+    """Returns an account of count outputs."""
+    return Account(bytes(4), outputs(count))
+
+
+def sequence():
+    """Returns ten outputs of HD keys followed by one of an EC key."""
+    return outputs(10) + [
+        Output([SCRIPT_EXPRESSION_TAG_MAP[403]], ECKey(bytes(33), None, None))
+    ]
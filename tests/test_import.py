@@ -0,0 +1,123 @@
+# The MIT License (MIT)
+
+# Copyright (c) 2021 Tom J. Sun
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+import os
+import subprocess
+import sys
+from unittest import TestCase
+import urtypes
+
+SRC = os.path.dirname(os.path.dirname(urtypes.__file__))
+
+
+def import_times(code):
+    # Runs code in a new interpreter with -X importtime, and returns the
+    # cumulative import time in microseconds of each module it imported.
+    env = dict(os.environ, PYTHONPATH=SRC)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line[len("import time:") :].split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+class ImportTestCase(TestCase):
+    def test_import(self):
+        times = import_times("import urtypes")
+        self.assertIn("urtypes", times)
+        for name in times:
+            self.assertFalse(name.startswith("urtypes.crypto."), name)
+        for name in ("urtypes.bytes", "hashlib", "binascii"):
+            self.assertNotIn(name, times)
+
+        times = import_times("from urtypes import PSBT, Bytes")
+        self.assertIn("urtypes.crypto.psbt", times)
+        self.assertIn("urtypes.bytes", times)
+        for name in ("urtypes.crypto.hd_key", "urtypes.crypto.output", "hashlib"):
+            self.assertNotIn(name, times)
+
+    def test_import_time(self):
+        eager = "import urtypes\n" + "".join(
+            "import urtypes.crypto.{}\n".format(name)
+            for name in urtypes.crypto._MODULES
+        )
+        lazy = min(import_times("import urtypes")["urtypes"] for _ in range(3))
+        full = min(
+            sum(
+                time
+                for name, time in import_times(eager).items()
+                if name == "urtypes" or name.startswith("urtypes.crypto.")
+            )
+            for _ in range(3)
+        )
+        self.assertLess(
+            lazy, full, "{}us lazily, {}us with every type".format(lazy, full)
+        )
+
+    def test_names(self):
+        namespace = {}
+        exec("from urtypes import *", namespace)
+        for name in ("Bytes", "PSBT", "HDKey", "Output", "decode_any", "RegistryItem"):
+            self.assertIs(namespace[name], getattr(urtypes, name))
+        self.assertIn("Account", dir(urtypes))
+        self.assertIn("Keypath", dir(urtypes.crypto))
+        self.assertIs(urtypes.crypto.hd_key.HDKey, urtypes.HDKey)
+        for name in urtypes.crypto._MODULES:
+            module = getattr(urtypes, name)
+            self.assertIs(module, getattr(urtypes.crypto, name))
+            self.assertEqual(module.__name__, "urtypes.crypto." + name)
+            for attribute in module.__all__:
+                self.assertIs(getattr(urtypes, attribute), getattr(module, attribute))
+        self.assertEqual(urtypes.bytes.__name__, "urtypes.bytes")
+        namespace = {}
+        exec("from urtypes.crypto import *", namespace)
+        self.assertIs(namespace["PathComponent"], urtypes.PathComponent)
+        with self.assertRaises(AttributeError):
+            urtypes.Unknown
+        with self.assertRaises(AttributeError):
+            urtypes.crypto.Unknown
+
+    def test_decode_any(self):
+        # decode_any imports the types it may have to decode.
+        code = (
+            "import binascii, urtypes\n"
+            "item = urtypes.decode_any(binascii.unhexlify('d90131a20100020a'))\n"
+            "print(type(item).__name__)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            env=dict(os.environ, PYTHONPATH=SRC),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(result.stdout.strip(), "CoinInfo")
@@ -0,0 +1,105 @@
+# The MIT License (MIT)
+
+# Copyright (c) 2021 Tom J. Sun
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+from urtypes.cbor import extract, BufferEncoder
+from urtypes.crypto import Account, Output
+from urtypes.parallel import decode_array, encode_array, PARALLEL_ITEM_THRESHOLD
+from tests.fixtures import account
+
+
+class ParallelTestCase(TestCase):
+    def test_decode_array(self):
+        for outputs in (0, 1, 2, 7, 100):
+            item = account(outputs)
+            cbor = item.to_cbor()
+            with ThreadPoolExecutor(3) as executor:
+                for workers in (1, 2, 3):
+                    self.assertEqual(
+                        decode_array(
+                            cbor,
+                            Output,
+                            [2],
+                            workers=workers,
+                            executor=executor,
+                            threshold=0,
+                        ),
+                        item.output_descriptors,
+                    )
+            self.assertEqual(decode_array(cbor, Output, [2]), item.output_descriptors)
+
+    def test_decode_array_processes(self):
+        item = account(50)
+        cbor = item.to_cbor()
+        outputs = decode_array(cbor, Output, [2], workers=2, threshold=0)
+        self.assertEqual(outputs, item.output_descriptors)
+        self.assertEqual(Account(extract(cbor, [1]).to_bytes(4, "big"), outputs), item)
+
+    def test_encode_array(self):
+        for outputs in (0, 1, 2, 7, 100):
+            item = account(outputs)
+            array = BufferEncoder()
+            array.encode([output.to_data_item() for output in item.output_descriptors])
+            with ThreadPoolExecutor(3) as executor:
+                for workers in (1, 2, 3):
+                    self.assertEqual(
+                        encode_array(
+                            item.output_descriptors,
+                            workers=workers,
+                            executor=executor,
+                            threshold=0,
+                        ),
+                        array.output,
+                    )
+            self.assertEqual(encode_array(item.output_descriptors), array.output)
+
+    def test_to_cbor(self):
+        for outputs in (0, 7, PARALLEL_ITEM_THRESHOLD):
+            item = account(outputs)
+            cbor = item.to_cbor()
+            with ThreadPoolExecutor(3) as executor:
+                for workers in (1, 2, 3):
+                    self.assertEqual(
+                        item.to_cbor(workers=workers, executor=executor), cbor
+                    )
+                    self.assertEqual(
+                        item.to_cbor(as_bytes=True, canonical=True, executor=executor),
+                        item.to_cbor(canonical=True),
+                    )
+        item = Account(None, None)
+        self.assertEqual(item.to_cbor(workers=2), item.to_cbor())
+        item = account(7)
+        item.memoize()
+        self.assertEqual(item.to_cbor(workers=2), account(7).to_cbor())
+
+    def test_to_cbor_processes(self):
+        item = account(PARALLEL_ITEM_THRESHOLD)
+        self.assertEqual(item.to_cbor(workers=2), item.to_cbor())
+
+    def test_to_cbor_zero_copy(self):
+        # The keys of a zero_copy decode are memoryviews into the payload,
+        # which are copied to be sent to the pool.
+        cbor = account(PARALLEL_ITEM_THRESHOLD).to_cbor()
+        item = Account.from_cbor(cbor, zero_copy=True)
+        self.assertIsInstance(item.output_descriptors[0].crypto_key.key, memoryview)
+        self.assertEqual(item.to_cbor(workers=2), cbor)
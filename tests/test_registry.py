@@ -0,0 +1,663 @@
+# The MIT License (MIT)
+
+# Copyright (c) 2021 Tom J. Sun
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import binascii
+import copy
+import hashlib
+import io
+import pickle
+import tracemalloc
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+from urtypes import (
+    decode_any,
+    decode_sequence,
+    encode_sequence,
+    REGISTRY_TAG_MAP,
+    REGISTRY_TYPE_MAP,
+    RegistryItem,
+)
+from urtypes.parallel import encode_array
+from urtypes.cbor import (
+    find,
+    InvalidCborError,
+    EncoderError,
+    BufferEncoder,
+    DataItem,
+    Mapping,
+    Tagging,
+)
+from urtypes.crypto import (
+    Account,
+    BIP39,
+    CoinInfo,
+    Output,
+    PSBT,
+    HDKey,
+    ECKey,
+    Keypath,
+    MultiKey,
+    PathComponent,
+    ScriptExpression,
+    SCRIPT_EXPRESSION_TAG_MAP,
+)
+from tests import fixtures
+
+
+class SequenceTestCase(TestCase):
+    def test_encode_sequence(self):
+        items = fixtures.sequence()
+        cbor = encode_sequence(items)
+        self.assertEqual(cbor, b"".join(item.to_cbor() for item in items))
+        self.assertEqual(encode_sequence([]), b"")
+
+    def test_decode_sequence(self):
+        items = fixtures.sequence()
+        cbor = b"".join(item.to_cbor() for item in items)
+        self.assertEqual(list(decode_sequence(cbor, Output)), items)
+        self.assertEqual(list(decode_sequence(cbor, Output, lazy=True)), items)
+        self.assertEqual(list(decode_sequence(b"", Output)), [])
+
+        sequence = decode_sequence(cbor + b"\xd9", Output)
+        for item in items:
+            self.assertEqual(next(sequence), item)
+        with self.assertRaises(InvalidCborError):
+            next(sequence)
+
+
+class EncodeIntoTestCase(TestCase):
+    def item(self):
+        return fixtures.output(0)
+
+    def test_to_cbor_into(self):
+        item = self.item()
+        cbor = item.to_cbor()
+
+        buf = bytearray(len(cbor))
+        self.assertEqual(item.to_cbor_into(buf), len(cbor))
+        self.assertEqual(buf, cbor)
+
+        buf = bytearray(b"\xff" * (len(cbor) + 8))
+        end = item.to_cbor_into(memoryview(buf), 4)
+        self.assertEqual(end, len(cbor) + 4)
+        self.assertEqual(buf[4:end], cbor)
+        self.assertEqual(buf[:4], b"\xff" * 4)
+        self.assertEqual(buf[end:], b"\xff" * 4)
+
+    def test_to_cbor_into_too_small(self):
+        item = self.item()
+        buf = bytearray(len(item.to_cbor()) - 1)
+        with self.assertRaises(EncoderError):
+            item.to_cbor_into(buf)
+        self.assertEqual(len(buf), len(item.to_cbor()) - 1)
+
+    def test_encoded_size(self):
+        for item in fixtures.sequence():
+            self.assertEqual(item.encoded_size(), len(item.to_cbor()))
+
+    def test_to_cbor_as_bytes(self):
+        item = self.item()
+        cbor = item.to_cbor(as_bytes=True)
+        self.assertIs(type(cbor), bytes)
+        self.assertEqual(cbor, item.to_cbor())
+
+
+class MemoizeTestCase(TestCase):
+    def account(self):
+        return Account(bytes(4), fixtures.sequence())
+
+    def test_memoize(self):
+        account = self.account()
+        cbor = account.to_cbor()
+        account.memoize()
+        self.assertEqual(account.to_cbor(), cbor)
+        self.assertEqual(account.encoded_size(), len(cbor))
+        cached = account.to_cbor(as_bytes=True)
+        self.assertEqual(cached, cbor)
+        self.assertIs(account.to_cbor(as_bytes=True), cached)
+        self.assertEqual(Account.from_data_item(account.to_data_item()), account)
+
+        account.memoize(False)
+        self.assertEqual(account.to_cbor(), cbor)
+
+        account = Account.from_cbor(cbor, lazy=True)
+        account.memoize()
+        self.assertEqual(account.to_cbor(), cbor)
+        account.output_descriptors[0].crypto_key.name = "key"
+        self.assertNotEqual(account.to_cbor(), cbor)
+
+    def test_invalidate(self):
+        expected = self.account()
+        account = self.account()
+        account.memoize()
+        account.to_cbor()
+        outputs = account.output_descriptors
+        untouched = outputs[1].to_cbor(as_bytes=True)
+
+        for item in (account, expected):
+            item.master_fingerprint = b"\x01\x02\x03\x04"
+        self.assertEqual(account.to_cbor(), expected.to_cbor())
+
+        for item in (account, expected):
+            item.output_descriptors[0].crypto_key.origin.depth = 2
+        self.assertEqual(account.to_cbor(), expected.to_cbor())
+
+        for item in (account, expected):
+            item.output_descriptors[2].crypto_key.name = "key"
+        self.assertEqual(account.to_cbor(), expected.to_cbor())
+
+        for item in (account, expected):
+            item.output_descriptors.append(fixtures.sequence()[-1])
+        self.assertEqual(account.to_cbor(), expected.to_cbor())
+
+        for item in (account, expected):
+            item.output_descriptors[-1].crypto_key.data = bytes(range(33))
+        self.assertEqual(account.to_cbor(), expected.to_cbor())
+
+        for item in (account, expected):
+            item.output_descriptors[3].crypto_key.origin.components[0].index = 44
+        self.assertEqual(account.to_cbor(), expected.to_cbor())
+
+        for item in (account, expected):
+            item.output_descriptors[4].crypto_key.origin.components.pop()
+        self.assertEqual(account.to_cbor(), expected.to_cbor())
+
+        self.assertIs(outputs[1].to_cbor(as_bytes=True), untouched)
+        self.assertEqual(Account.from_cbor(account.to_cbor()), expected)
+
+        copied = copy.deepcopy(account)
+        copied.output_descriptors[5].crypto_key.origin.depth = 7
+        self.assertEqual(account.to_cbor(), expected.to_cbor())
+        expected.output_descriptors[5].crypto_key.origin.depth = 7
+        self.assertEqual(copied.to_cbor(), expected.to_cbor())
+
+    def test_opt_in(self):
+        # Items are only tracked once they have cached an encoding.
+        account = self.account()
+        account.to_cbor()
+        key = account.output_descriptors[0].crypto_key
+        for item in (account, key, key.origin, key.origin.components[0]):
+            self.assertFalse(item._tracking, type(item).__name__)
+        self.assertIs(type(key.origin.components), list)
+        account.memoize()
+        account.to_cbor()
+        for item in (account, key, key.origin, key.origin.components[0]):
+            self.assertTrue(item._tracking, type(item).__name__)
+            self.assertIsInstance(item, type(item).__base__)
+
+    def test_shared_child(self):
+        # A child shared between items does not keep them alive.
+        coin_info = CoinInfo(0, 1)
+        keys = [
+            HDKey({"key": bytes(33), "chain_code": bytes(32), "use_info": coin_info})
+            for _ in range(3)
+        ]
+        for key in keys:
+            key.memoize()
+            key.to_cbor()
+        cbor = keys[0].to_cbor()
+        coin_info.network = 0
+        self.assertNotEqual(keys[1].to_cbor(), cbor)
+        self.assertEqual(keys[1].to_cbor(), keys[2].to_cbor())
+        ref = weakref.ref(keys[0])
+        del keys[0], key
+        self.assertIsNone(ref())
+
+    def test_invalidate_shared(self):
+        account = self.account()
+        account.memoize()
+        cbor = account.to_cbor()
+        expression = account.output_descriptors[0].script_expressions[0]
+        tag = expression.tag
+        try:
+            expression.tag = 499
+            self.assertNotEqual(account.to_cbor(), cbor)
+            self.assertEqual(account.to_cbor(), self.account().to_cbor())
+        finally:
+            expression.tag = tag
+        self.assertEqual(account.to_cbor(), cbor)
+
+
+class StreamTestCase(TestCase):
+    def test_stream(self):
+        class Socket:
+            def __init__(self):
+                self.sent = bytearray()
+
+            def sendall(self, data):
+                self.sent.extend(data)
+
+        memoized = Account(bytes(4), fixtures.sequence())
+        memoized.memoize()
+        for item in (
+            PSBT(bytes(range(256)) * 1000),
+            Account(bytes(4), fixtures.sequence()),
+            Account(None, []),
+            Account(None, None),
+            memoized,
+        ):
+            cbor = item.to_cbor()
+            for chunk_size in (1, 100, 65536):
+                chunks = []
+                item.to_cbor_stream(chunks.append, chunk_size)
+                self.assertEqual(b"".join(chunks), cbor)
+                for chunk in chunks:
+                    self.assertLessEqual(len(chunk), chunk_size)
+
+            sink = io.BytesIO()
+            item.to_cbor_stream(sink)
+            self.assertEqual(sink.getvalue(), cbor)
+            sink = Socket()
+            item.to_cbor_stream(sink)
+            self.assertEqual(sink.sent, cbor)
+
+    def test_stream_memory(self):
+        psbt = PSBT(bytes(8 * 1024 * 1024))
+        tracemalloc.start()
+        try:
+            psbt.to_cbor_stream(len, 4096)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertLess(peak, 64 * 1024)
+
+
+class CanonicalTestCase(TestCase):
+    def test_content_digest(self):
+        item = fixtures.output(0)
+        cbor = item.to_cbor(canonical=True)
+        self.assertEqual(cbor, item.to_cbor())
+        self.assertEqual(item.content_digest(), hashlib.sha256(cbor).digest())
+        self.assertEqual(
+            binascii.hexlify(item.content_digest()),
+            b"09330d344a01f8521d5ae18a434831b3937b3243ea465ac341912081755e9d9b",
+        )
+
+        memoized = fixtures.output(0)
+        memoized.memoize()
+        memoized.to_cbor()
+        self.assertEqual(memoized.content_digest(), item.content_digest())
+        self.assertNotEqual(fixtures.output(1).content_digest(), item.content_digest())
+
+
+class PreserveRawTestCase(TestCase):
+    def reordered(self, value):
+        # Reverses the order of map entries, which to_cbor() would undo.
+        if isinstance(value, dict):
+            return {key: self.reordered(value[key]) for key in reversed(list(value))}
+        if isinstance(value, list):
+            return [self.reordered(item) for item in value]
+        if isinstance(value, DataItem):
+            return DataItem(value.tag, self.reordered(value.map))
+        return value
+
+    def payload(self, item):
+        encoder = BufferEncoder()
+        encoder.encode(self.reordered(item.to_data_item()))
+        return bytes(encoder.output)
+
+    def test_unchanged(self):
+        items = fixtures.sequence()
+        for cls, item in (
+            (Account, Account(bytes(4), items)),
+            (Output, items[0]),
+            (HDKey, items[0].crypto_key),
+        ):
+            cbor = self.payload(item)
+            self.assertNotEqual(cls.from_cbor(cbor).to_cbor(), cbor)
+            decoded = cls.from_cbor(cbor, preserve_raw=True)
+            self.assertEqual(decoded, item)
+            self.assertEqual(decoded.to_cbor(), cbor)
+            self.assertEqual(decoded.to_cbor(as_bytes=True), cbor)
+            self.assertEqual(decoded.encoded_size(), len(cbor))
+
+    def test_changed(self):
+        expected = Account(bytes(4), fixtures.sequence())
+        cbor = self.payload(expected)
+        account = Account.from_cbor(cbor, preserve_raw=True)
+        for item in (account, expected):
+            item.output_descriptors[0].crypto_key.origin.depth = 2
+        changed = account.to_cbor()
+        self.assertNotEqual(changed, cbor)
+        self.assertEqual(Account.from_cbor(changed), expected)
+
+        # Only the changed output is encoded again.
+        for output in account.output_descriptors[1:]:
+            self.assertIn(self.payload(output), changed)
+        self.assertNotIn(self.payload(expected.output_descriptors[0]), changed)
+
+    def test_lazy(self):
+        expected = Account(bytes(4), fixtures.sequence())
+        account = Account.from_cbor(self.payload(expected), lazy=True)
+        for item in (account, expected):
+            item.output_descriptors[0].crypto_key.origin.components[1].index = 99
+        self.assertEqual(account.to_cbor(), expected.to_cbor())
+
+    def test_copy(self):
+        expected = Account(bytes(4), fixtures.sequence())
+        cbor = self.payload(expected)
+        account = Account.from_cbor(bytearray(cbor), preserve_raw=True)
+        for copied in (
+            pickle.loads(pickle.dumps(account)),
+            copy.deepcopy(account),
+            copy.deepcopy(account.output_descriptors[0]),
+        ):
+            self.assertEqual(copied.to_cbor(), copied.to_cbor(as_bytes=True))
+        copied = pickle.loads(pickle.dumps(account))
+        self.assertEqual(copied.to_cbor(), cbor)
+        copied.output_descriptors[0].crypto_key.origin.depth = 2
+        expected.output_descriptors[0].crypto_key.origin.depth = 2
+        self.assertEqual(Account.from_cbor(copied.to_cbor()), expected)
+        self.assertEqual(account.to_cbor(), cbor)
+        start, end = find(cbor, [2])
+        with ThreadPoolExecutor(2) as executor:
+            self.assertEqual(
+                encode_array(account.output_descriptors, executor=executor),
+                cbor[start:end],
+            )
+        self.assertEqual(
+            encode_array(account.output_descriptors, workers=2, threshold=0),
+            cbor[start:end],
+        )
+
+
+class RegistryTestCase(TestCase):
+    def test_maps(self):
+        for cls in (Account, BIP39, CoinInfo, ECKey, HDKey, Keypath, Output, PSBT):
+            registry_type = cls.registry_type()
+            self.assertIs(REGISTRY_TAG_MAP[registry_type.tag], cls)
+            self.assertIs(REGISTRY_TYPE_MAP[registry_type.type], cls)
+        for tag in SCRIPT_EXPRESSION_TAG_MAP:
+            self.assertIs(REGISTRY_TAG_MAP[tag], Output)
+
+        class Key(HDKey):
+            pass
+
+        self.assertIs(REGISTRY_TAG_MAP[303], HDKey)
+
+    def test_decode_any(self):
+        items = fixtures.sequence()
+        account = Account(bytes(4), items)
+        psbt = PSBT(bytes(10))
+        for item in (account, psbt, items[0].crypto_key, items[-1].crypto_key):
+            self.assertEqual(
+                decode_any(item.to_cbor(), item.registry_type().type), item
+            )
+            cbor = BufferEncoder()
+            cbor.encode(DataItem(item.registry_type().tag, item.to_data_item()))
+            self.assertEqual(decode_any(cbor.output), item)
+        for item in items:
+            self.assertEqual(decode_any(item.to_cbor()), item)
+            self.assertEqual(decode_any(item.to_cbor(), "crypto-output"), item)
+
+        with self.assertRaises(ValueError):
+            decode_any(account.to_cbor())
+        with self.assertRaises(ValueError):
+            decode_any(binascii.unhexlify("d9ffff00"))
+        with self.assertRaises(ValueError):
+            decode_any(account.to_cbor(), "crypto-unknown")
+
+
+class MemoryTestCase(TestCase):
+    def allocated(self, make, count=1000):
+        # Bytes allocated per object built by make, with tracemalloc.
+        tracemalloc.start()
+        try:
+            before, _ = tracemalloc.get_traced_memory()
+            objects = [make() for _ in range(count)]
+            after, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        del objects
+        return (after - before) / count
+
+    def test_slots(self):
+        class Plain:
+            pass
+
+        def plain(item, fields):
+            # The same attributes in a per-instance __dict__.
+            def make():
+                obj = Plain()
+                for name in fields:
+                    setattr(obj, name, getattr(item, name))
+                return obj
+
+            return make
+
+        class OldDataItem(Tagging):
+            # DataItem before it was slotted.
+            def __init__(self, tag, map):
+                super().__init__(tag, Mapping(map))
+                self.tag = tag
+                self.map = map
+
+        output = fixtures.output(0)
+        key = output.crypto_key
+        origin = key.origin
+        component = origin.components[0]
+        expression = output.script_expressions[0]
+        props = {"key": key.key, "chain_code": key.chain_code, "origin": origin}
+        rows = [
+            (
+                "DataItem",
+                lambda: DataItem(303, key.key),
+                lambda: OldDataItem(303, key.key),
+            ),
+            (
+                "PathComponent",
+                lambda: PathComponent(component.index, component.hardened),
+                plain(component, ("index", "hardened", "wildcard")),
+            ),
+            (
+                "ScriptExpression",
+                lambda: ScriptExpression(expression.tag, expression.expression),
+                plain(expression, ("tag", "expression")),
+            ),
+        ]
+        for item, make in (
+            (key, lambda: HDKey(props)),
+            (
+                origin,
+                lambda: Keypath(
+                    origin.components, origin.source_fingerprint, origin.depth
+                ),
+            ),
+            (CoinInfo(0, 1), lambda: CoinInfo(0, 1)),
+            (ECKey(bytes(33), 0, False), lambda: ECKey(key.key, 0, False)),
+            (output, lambda: Output(output.script_expressions, key)),
+        ):
+            fields = RegistryItem.__slots__[:-1] + type(item)._fields
+            rows.append((type(item).__name__, make, plain(item, fields)))
+
+        report = ["Bytes per object, slotted against a __dict__ baseline:"]
+        for name, slotted, unslotted in rows:
+            size = self.allocated(slotted)
+            baseline = self.allocated(unslotted)
+            report.append(
+                "  {:<16} {:>5.0f} B  baseline {:>5.0f} B".format(name, size, baseline)
+            )
+            self.assertLess(size, baseline, "\n".join(report))
+
+    def test_no_dict(self):
+        key = fixtures.output(0).crypto_key
+        for item in (
+            key,
+            key.origin,
+            key.origin.components[0],
+            CoinInfo(0, 1),
+            ECKey(bytes(33), 0, False),
+            Output([SCRIPT_EXPRESSION_TAG_MAP[404]], key),
+            SCRIPT_EXPRESSION_TAG_MAP[404],
+            PSBT(bytes(10)),
+            DataItem(303, {}),
+        ):
+            self.assertFalse(hasattr(item, "__dict__"), type(item).__name__)
+
+    def test_subclass_dict(self):
+        # Attributes kept in the __dict__ of a subclass are still checked by
+        # memoize().
+        class Named(CoinInfo):
+            def to_data_item(self):
+                item = super().to_data_item()
+                item[100] = self.label
+                return item
+
+        coin_info = Named(0, 1)
+        coin_info.label = "a"
+        coin_info.memoize()
+        cbor = coin_info.to_cbor()
+        coin_info.label = "b"
+        self.assertNotEqual(coin_info.to_cbor(), cbor)
+
+
+class HashTestCase(TestCase):
+    def items(self):
+        outputs = fixtures.sequence()
+        multi_key = MultiKey(
+            2,
+            [ECKey(bytes(33), 0, False)],
+            [output.crypto_key for output in outputs[:2]],
+        )
+        return outputs + [
+            Account(bytes(4), outputs),
+            multi_key,
+            Output(
+                [SCRIPT_EXPRESSION_TAG_MAP[401], SCRIPT_EXPRESSION_TAG_MAP[407]],
+                multi_key,
+            ),
+            CoinInfo(0, 1),
+            BIP39(["abandon", "about"], "en"),
+            PSBT(bytes(10)),
+        ]
+
+    def test_hash(self):
+        items = self.items()
+        for item in items:
+            if isinstance(item, MultiKey):
+                # Only decoded as part of an Output.
+                continue
+            for decoded in (
+                type(item).from_cbor(item.to_cbor()),
+                type(item).from_cbor(item.to_cbor(), zero_copy=True, lazy=True),
+            ):
+                self.assertEqual(decoded, item)
+                self.assertEqual(hash(decoded), hash(item))
+        self.assertEqual(len(set(items + self.items())), len(items))
+        self.assertEqual(len({hash(item) for item in items}), len(items))
+
+    def test_invalidate(self):
+        key = self.items()[0].crypto_key
+        other = self.items()[0].crypto_key
+        self.assertEqual(hash(key), hash(other))
+        key.name = "key"
+        self.assertNotEqual(key, other)
+        self.assertNotEqual(hash(key), hash(other))
+        other.name = "key"
+        self.assertEqual(hash(key), hash(other))
+
+        # Changes to child items and list attributes are noticed too.
+        key.origin.depth = 3
+        self.assertNotEqual(hash(key), hash(other))
+        other.origin = Keypath(
+            list(key.origin.components), key.origin.source_fingerprint, 3
+        )
+        self.assertEqual(hash(key), hash(other))
+        key.origin.components.append(PathComponent(0, False))
+        self.assertNotEqual(hash(key), hash(other))
+        other.origin.components.append(PathComponent(0, False))
+        self.assertEqual(hash(key), hash(other))
+
+        # As are changes to path components made in place.
+        for item in (key, other):
+            item.origin.components[0].index = 44
+            self.assertNotEqual(item, self.items()[0].crypto_key)
+        self.assertEqual(key, other)
+        self.assertEqual(hash(key), hash(other))
+
+    def test_shared_child(self):
+        # Hashing does not register items with a child they share.
+        coin_info = CoinInfo(0, 1)
+        keys = [
+            HDKey({"key": bytes([i]) * 33, "chain_code": None, "use_info": coin_info})
+            for i in range(3)
+        ]
+        self.assertEqual(len(set(keys)), len(keys))
+        self.assertIsNone(coin_info._parents)
+        value = hash(keys[0])
+        coin_info.network = 0
+        self.assertNotEqual(hash(keys[0]), value)
+        ref = weakref.ref(keys[0])
+        del keys[0]
+        self.assertIsNone(ref())
+
+    def test_eq(self):
+        # Comparing items does not hash them.
+        key = self.items()[0].crypto_key
+        other = self.items()[0].crypto_key
+        self.assertEqual(key, other)
+        self.assertIsNone(key._hash)
+        self.assertIsNone(other._hash)
+
+    def test_eq_cached_hash(self):
+        # Items whose cached hashes differ are unequal without comparing
+        # their fields.
+        class Key(bytes):
+            compared = 0
+
+            def __eq__(self, o):
+                Key.compared += 1
+                return bytes.__eq__(self, o)
+
+            __hash__ = bytes.__hash__
+
+        key, other = (
+            HDKey({"key": Key(bytes(33)), "chain_code": None, "name": name})
+            for name in ("a", "b")
+        )
+        self.assertNotEqual(key, other)
+        self.assertEqual(Key.compared, 1)
+        hash(key)
+        hash(other)
+        Key.compared = 0
+        self.assertNotEqual(key, other)
+        self.assertEqual(Key.compared, 0)
+        other.name = "a"
+        self.assertEqual(key, other)
+        self.assertEqual(Key.compared, 1)
+
+    def test_buffer(self):
+        data = bytearray(33)
+        key = ECKey(data, 0, False)
+        value = hash(key)
+        self.assertIsNone(key._hash)
+        data[0] = 2
+        self.assertNotEqual(hash(key), value)
+        self.assertEqual(hash(key), hash(ECKey(bytes(data), 0, False)))
+
+    def test_pickle(self):
+        item = self.items()[0]
+        hash(item)
+        copy = pickle.loads(pickle.dumps(item))
+        self.assertIsNone(copy._hash)
+        self.assertEqual(hash(copy), hash(item))